@@ -1,13 +1,57 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import joblib
 import json
 import numpy as np
 import pandas as pd
 import os
+import sys
+import glob
 import logging
+import tempfile
+import threading
 from datetime import datetime
-from scipy import stats
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional faster serializer; fall back to Flask's jsonify
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    # Request validation falls back to the manual checks in validate_input_data
+    fastjsonschema = None
+
+try:
+    from numba import njit, types as nb
+    # pandas copy-on-write hands out read-only column arrays, so kernel inputs are typed read-only
+    def readonly_1d(dtype):
+        return nb.Array(dtype, 1, 'C', readonly=True)
+except ImportError:
+    # Numba is optional; numeric kernels fall back to NumPy
+    njit = None
+
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    # ONNX inference is optional; models are scored with scikit-learn instead
+    ort = None
+    convert_sklearn = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    # Arrow copies of prediction files and Arrow responses are optional; fall back to CSV/JSON only
+    pa = None
+    feather = None
 
 # Custom Exception Classes
 class ModelLoadError(Exception):
@@ -68,25 +112,37 @@ def health_check():
         'current_model': current_model_type,
         'available_models': len(models),
         'models': {k: v['config'] for k, v in models.items()},
+        'csv_pipeline_available': _predict_fn is not None,
         'timestamp': datetime.now().isoformat()
     })
 
+@lru_cache(maxsize=1)
+def get_model_catalog():
+    """
+    Static description of the loaded models, built once per model load.
+    The cache is cleared by load_model_and_features.
+    """
+    catalog = []
+    for model_id, model_data in models.items():
+        config = model_data['config']
+        catalog.append({
+            'id': model_id,
+            'name': config['name'],
+            'description': config['description'],
+            'months_required': config['months_required'],
+            'feature_count': len(model_data['feature_names'])
+        })
+    return tuple(catalog)
+
 @app.route('/api/models', methods=['GET'])
 def get_available_models():
     """Get list of available prediction models"""
     try:
-        model_list = []
-        for model_id, model_data in models.items():
-            config = model_data['config']
-            model_info = {
-                'id': model_id,
-                'name': config['name'],
-                'description': config['description'],
-                'months_required': config['months_required'],
-                'is_current': model_id == current_model_type,
-                'feature_count': len(model_data['feature_names'])
-            }
-            model_list.append(model_info)
+        # Only the current-model flag changes between requests
+        model_list = [
+            dict(model_info, is_current=model_info['id'] == current_model_type)
+            for model_info in get_model_catalog()
+        ]
         
         return jsonify({
             'models': model_list,
@@ -166,6 +222,35 @@ current_model_type = '1_3'  # Default model
 feature_names = None
 scaler = None
 
+# Locations of generated prediction files and the shared CSV data
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BACKEND_DIR, 'output')
+DATA_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'data')
+
+# Import the CSV prediction pipeline once at startup (the ml package lives in the backend directory)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+try:
+    from ml.predict import predict_risk_from_raw_data as _predict_fn
+except ImportError as e:
+    logger.error(f"Could not import prediction functions: {str(e)}")
+    _predict_fn = None
+
+# Parsed prediction files, keyed by (path, mtime)
+_predictions_cache = {}
+# Course-data column lists for the most recently served predictions frame
+_course_columns_cache = {}
+
+# Serializes runs of the full CSV prediction pipeline within a worker process; a request that finds
+# it taken is answered with 503 at once instead of holding one of the worker's few threads
+_pipeline_lock = threading.Lock()
+
+# Worker threads for independent file reads (the CSV parsers release the GIL)
+_io_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='risk-io')
+
+# Worker threads for preparing the students of a batch prediction request
+_batch_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='risk-batch')
+
 # Available model configurations
 AVAILABLE_MODELS = {
     '1_3': {
@@ -194,6 +279,106 @@ AVAILABLE_MODELS = {
     }
 }
 
+# Risk bucket boundaries on the at-risk probability (0-1 scale)
+RISK_BUCKET_THRESHOLDS = np.array([0.45, 0.55, 0.70])
+RISK_BUCKET_LABELS = np.array(['minimal', 'low', 'medium', 'high'], dtype=object)
+
+# Labels of the rule-based risk factors reported for at-risk students, in rule order
+RISK_FACTOR_LABELS = [
+    'High Late Submission Rate',
+    'Low Academic Performance',
+    'Low Engagement',
+    'Declining Performance',
+    'Inconsistent Performance',
+    'Low Engagement Pattern'
+]
+RISK_FACTOR_BITS = 1 << np.arange(len(RISK_FACTOR_LABELS))
+# Label list for every combination of rule flags, indexed by the flags packed as a bitmask
+RISK_FACTOR_COMBINATIONS = [
+    [label for bit, label in enumerate(RISK_FACTOR_LABELS) if code >> bit & 1]
+    for code in range(1 << len(RISK_FACTOR_LABELS))
+]
+
+if njit is not None:
+    # Compiled eagerly at import for the one signature used, so no request pays the JIT cost
+    @njit(nb.void(readonly_1d(nb.float64), readonly_1d(nb.float64), nb.int8[::1]))
+    def _bucketize(values, thresholds, out):
+        """Compiled bucketing for a short, ascending threshold list (NaN gets code 0)"""
+        n_thresholds = thresholds.shape[0]
+        for i in range(values.shape[0]):
+            value = values[i]
+            if value != value:
+                # A missing value passes no threshold, so it is labelled 'minimal'
+                code = 0
+            else:
+                code = 0
+                while code < n_thresholds and value >= thresholds[code]:
+                    code += 1
+            out[i] = code
+else:
+    _bucketize = None
+
+def risk_bucket_codes(values, thresholds=RISK_BUCKET_THRESHOLDS):
+    """
+    Map risk values to bucket codes in one vectorized pass.
+    Codes index RISK_BUCKET_LABELS: 0=minimal, 1=low, 2=medium, 3=high.
+    NaN values get code 0; callers counting buckets should leave them out.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+    if _bucketize is None:
+        # np.digitize puts NaN past the last threshold
+        codes = np.digitize(values, thresholds)
+        codes[np.isnan(values)] = 0
+        return codes
+    codes = np.empty(values.shape[0], dtype=np.int8)
+    _bucketize(values, np.ascontiguousarray(thresholds, dtype=np.float64), codes)
+    return codes
+
+if njit is not None:
+    @njit(nb.void(*[readonly_1d(nb.float64)] * 6, nb.int64[::1]))
+    def _pack_risk_factors(late_rate, final_score, time_spent, declining, inconsistent, low_engagement, out):
+        """Evaluate the six risk-factor rules per row and pack the flags as a bitmask"""
+        for i in range(out.shape[0]):
+            code = 0
+            if late_rate[i] > 0.3:
+                code |= 1
+            if final_score[i] < 60:
+                code |= 2
+            if time_spent[i] < 300:
+                code |= 4
+            if declining[i] == 1:
+                code |= 8
+            if inconsistent[i] == 1:
+                code |= 16
+            if low_engagement[i] == 1:
+                code |= 32
+            out[i] = code
+else:
+    _pack_risk_factors = None
+
+def risk_factor_codes(late_rate, final_score, time_spent, declining, inconsistent, low_engagement):
+    """
+    Pack the risk-factor rule flags of every row into a bitmask in one pass.
+    Codes index RISK_FACTOR_COMBINATIONS (bit order follows RISK_FACTOR_LABELS).
+    """
+    if _pack_risk_factors is None:
+        masks = np.column_stack([
+            late_rate > 0.3,
+            final_score < 60,
+            time_spent < 300,
+            declining == 1,
+            inconsistent == 1,
+            low_engagement == 1
+        ])
+        return masks @ RISK_FACTOR_BITS
+    columns = [
+        np.ascontiguousarray(values, dtype=np.float64)
+        for values in (late_rate, final_score, time_spent, declining, inconsistent, low_engagement)
+    ]
+    codes = np.empty(columns[0].shape[0], dtype=np.int64)
+    _pack_risk_factors(*columns, codes)
+    return codes
+
 def convert_to_json_serializable(obj):
     """
     Convert numpy/pandas data types to JSON-serializable Python native types
@@ -215,10 +400,143 @@ def convert_to_json_serializable(obj):
     else:
         return obj
 
+def frame_to_records(df):
+    """
+    Convert a DataFrame to a list of JSON-serializable record dictionaries.
+    Each column is cast to native Python values once (numeric columns via tolist),
+    so no per-cell boxing or recursive conversion pass is needed afterwards.
+    """
+    columns = list(df.columns)
+    column_values = []
+    for col in columns:
+        series = df[col]
+        if series.dtype == object:
+            # Object columns may still hold numpy scalars; convert only those
+            column_values.append([convert_to_json_serializable(value) for value in series.to_numpy()])
+        else:
+            column_values.append(series.tolist())
+    return [dict(zip(columns, values)) for values in zip(*column_values)]
+
+def json_response(payload, status=200):
+    """
+    Serialize a response payload with orjson when available.
+    orjson handles numpy scalars and arrays natively, so payloads do not need
+    a convert_to_json_serializable pass first. Falls back to jsonify.
+    """
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return Response(body, status=status, mimetype='application/json')
+    return jsonify(convert_to_json_serializable(payload)), status
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+def wants_arrow():
+    """True when the client prefers an Arrow IPC stream over JSON (browsers keep getting JSON)"""
+    return request.accept_mimetypes.best_match(['application/json', ARROW_STREAM_MIMETYPE]) == ARROW_STREAM_MIMETYPE
+
+def arrow_stream_response(columns):
+    """Serialize a dict of equal-length columns as an Arrow IPC stream response"""
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), mimetype=ARROW_STREAM_MIMETYPE)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    """True when the client prefers newline-delimited JSON (browsers keep getting a single JSON document)"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def ndjson_stream_response(records, header=None):
+    """
+    Stream records as newline-delimited JSON, optionally preceded by a header object line.
+    Each line is serialized as it is sent, so the full body is never held in memory.
+    """
+    if orjson is not None:
+        def dump_line(obj):
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) + b'\n'
+    else:
+        def dump_line(obj):
+            return (json.dumps(convert_to_json_serializable(obj)) + '\n').encode('utf-8')
+    
+    def generate():
+        if header is not None:
+            yield dump_line(header)
+        for record in records:
+            yield dump_line(record)
+    
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+def column_or_default(df, column, default):
+    """Return a column as a numpy array with missing values (or a missing column) set to default"""
+    if column in df.columns:
+        return df[column].fillna(default).to_numpy()
+    return np.full(len(df), default)
+
+def build_onnx_session(model, n_features):
+    """
+    Convert a fitted scikit-learn classifier into an ONNX Runtime session.
+    Returns None when ONNX support is not installed or the model cannot be converted.
+    """
+    if convert_sklearn is None:
+        return None
+    try:
+        onnx_model = convert_sklearn(
+            model,
+            initial_types=[('input', FloatTensorType([None, n_features]))],
+            options={id(model): {'zipmap': False}}
+        )
+        return ort.InferenceSession(onnx_model.SerializeToString(), providers=['CPUExecutionProvider'])
+    except Exception as e:
+        logger.warning(f"Could not convert model to ONNX, using scikit-learn for inference: {str(e)}")
+        return None
+
+def predict_probabilities(model_data, feature_matrix):
+    """
+    Class probabilities (columns ordered as model.classes_) for a 2-D feature matrix.
+    Uses the model's ONNX Runtime session when available, scikit-learn otherwise.
+    """
+    session = model_data.get('onnx_session')
+    if session is not None:
+        return session.run(['probabilities'], {'input': np.asarray(feature_matrix, dtype=np.float32)})[0].astype(np.float64)
+    model = model_data['model']
+    if hasattr(model, 'named_steps'):
+        feature_matrix = pd.DataFrame(feature_matrix, columns=model_data['feature_names'])
+    return model.predict_proba(feature_matrix)
+
+@lru_cache(maxsize=4096)
+def cached_row_probabilities(model_id, row_bytes):
+    """
+    Class probabilities for a single float32 feature row, memoized by model id and row content.
+    Repeated predictions for unchanged student data skip the model entirely.
+    The cache is cleared by load_model_and_features.
+    """
+    feature_row = np.frombuffer(row_bytes, dtype=np.float32).reshape(1, -1)
+    return tuple(predict_probabilities(models[model_id], feature_row)[0].tolist())
+
+def build_risk_factors(model, feature_names, top_n=5):
+    """
+    The model's top_n features by importance, already in the /api/predict response format
+    (pre-serialized when possible). Returns None if the model has no feature importances.
+    """
+    try:
+        if hasattr(model, 'feature_importances_'):
+            importances = dict(zip(feature_names, model.feature_importances_))
+            top_features = sorted(importances.items(), key=lambda x: x[1], reverse=True)[:top_n]
+            return prerender_json([{'name': name, 'importance': float(importance)} for name, importance in top_features])
+    except Exception as e:
+        logger.warning(f"Could not get feature importances: {str(e)}")
+    return None
+
 def load_model_and_features():
     """Load all available models and feature names with comprehensive error handling"""
     global models, feature_names, current_model_type
     
+    # The model catalog and memoized predictions describe the previous load; rebuild them on demand
+    get_model_catalog.cache_clear()
+    cached_row_probabilities.cache_clear()
+    
     try:
         # Get the directory where this script is located
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -244,15 +562,14 @@ def load_model_and_features():
             
             # Load the single model
             logger.info(f"Loading single model from: {model_path}")
-            model = joblib.load(model_path)
+            model = joblib.load(model_path, mmap_mode='r')
             
             if model is None:
                 raise ModelLoadError("Single model loaded but is None")
             
             # Load feature names
             logger.info(f"Loading feature names from: {feature_names_path}")
-            with open(feature_names_path, 'rb') as f:
-                model_feature_names = joblib.load(f)
+            model_feature_names = joblib.load(feature_names_path)
             
             if model_feature_names is None or len(model_feature_names) == 0:
                 raise ModelLoadError("Feature names loaded but are empty")
@@ -269,6 +586,8 @@ def load_model_and_features():
                     'model': model,
                     'feature_names': model_feature_names,
                     'scaler': model_scaler,
+                    'onnx_session': build_onnx_session(model, len(model_feature_names)),
+                    'risk_factors': build_risk_factors(model, model_feature_names),
                     'config': {
                         'name': 'Student Risk Model',
                         'description': 'Single risk prediction model',
@@ -308,7 +627,7 @@ def load_model_and_features():
                 
                 # Load model
                 logger.info(f"Loading model {model_id} from: {model_path}")
-                model = joblib.load(model_path)
+                model = joblib.load(model_path, mmap_mode='r')
                 
                 if model is None:
                     logger.warning(f"Model {model_id} loaded but is None")
@@ -316,8 +635,7 @@ def load_model_and_features():
                 
                 # Load feature names
                 logger.info(f"Loading feature names for {model_id} from: {feature_names_path}")
-                with open(feature_names_path, 'rb') as f:
-                    model_feature_names = joblib.load(f)
+                model_feature_names = joblib.load(feature_names_path)
                 
                 if model_feature_names is None or len(model_feature_names) == 0:
                     logger.warning(f"Feature names for {model_id} loaded but are empty")
@@ -333,6 +651,8 @@ def load_model_and_features():
                     'model': model,
                     'feature_names': model_feature_names,
                     'scaler': model_scaler,
+                    'onnx_session': build_onnx_session(model, len(model_feature_names)),
+                    'risk_factors': build_risk_factors(model, model_feature_names),
                     'config': model_config
                 }
                 
@@ -369,7 +689,7 @@ def load_model_and_features():
                 legacy_scaler_path = os.path.join(models_dir, 'scaler.pkl')
                 
                 if os.path.exists(legacy_model_path) and os.path.exists(legacy_feature_names_path):
-                    legacy_model = joblib.load(legacy_model_path)
+                    legacy_model = joblib.load(legacy_model_path, mmap_mode='r')
                     legacy_features = joblib.load(legacy_feature_names_path)
                     legacy_scaler = joblib.load(legacy_scaler_path) if os.path.exists(legacy_scaler_path) else None
                     
@@ -378,6 +698,8 @@ def load_model_and_features():
                             'model': legacy_model,
                             'feature_names': legacy_features,
                             'scaler': legacy_scaler,
+                            'onnx_session': build_onnx_session(legacy_model, len(legacy_features)),
+                            'risk_factors': build_risk_factors(legacy_model, legacy_features),
                             'config': {
                                 'name': 'Legacy Risk Model',
                                 'description': 'Original risk prediction model',
@@ -475,8 +797,68 @@ def validate_data_for_model(data, model_type):
     except Exception as e:
         return False, 0, f"Error validating data: {str(e)}"
 
+# Shape of a valid single-student prediction request, checked by the compiled fast path.
+# Anything it rejects goes through the manual checks below, which produce the error message.
+STUDENT_INPUT_SCHEMA = {
+    'type': 'object',
+    'required': ['courses'],
+    'properties': {
+        'courses': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'required': ['assignments'],
+                'properties': {
+                    'assignments': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'progress': {
+                                    'type': 'object',
+                                    'properties': {
+                                        'totalScore': {'type': ['number', 'null']},
+                                        'totalTime': {'type': ['number', 'null']},
+                                        'isLate': {'type': ['boolean', 'null']}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        'averageScore': {'type': 'number'},
+        'completionRate': {'type': 'number'},
+        'gradeLevel': {'type': 'number'}
+    }
+}
+
+if fastjsonschema is not None:
+    validate_student_schema = fastjsonschema.compile(STUDENT_INPUT_SCHEMA)
+else:
+    validate_student_schema = None
+
+def read_json_body():
+    """Parse the request body as JSON regardless of Content-Type, with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.loads(request.get_data())
+        except orjson.JSONDecodeError:
+            # orjson is strict JSON; Flask's parser also accepts NaN/Infinity, as json.dumps emits them
+            pass
+    return request.get_json(force=True)
+
 def validate_input_data(data):
     """Validate incoming request data"""
+    if validate_student_schema is not None:
+        try:
+            validate_student_schema(data)
+            return data
+        except fastjsonschema.JsonSchemaException:
+            pass  # Fall through to the checks below for a specific error message
+    
     if not data:
         raise DataValidationError("Request body is empty")
     
@@ -506,42 +888,8 @@ def validate_input_data(data):
         assignments = course['assignments']
         if not isinstance(assignments, list):
             raise DataValidationError(f"Course {i} assignments must be an array")
-    
-    # Validate optional numeric fields
-    numeric_fields = ['averageScore', 'completionRate', 'gradeLevel']
-    for field in numeric_fields:
-        if field in data:
-            try:
-                float(data[field])
-            except (ValueError, TypeError):
-                raise DataValidationError(f"Field {field} must be a number")
-    
-    return data
-    """Validate incoming request data"""
-    if not data:
-        raise DataValidationError("Request body is empty")
-    
-    if not isinstance(data, dict):
-        raise DataValidationError("Request data must be a JSON object")
-    
-    # Check for required fields or provide defaults
-    if 'courses' not in data:
-        logger.warning("No courses provided in request, using empty list")
-        data['courses'] = []
-    
-    if not isinstance(data['courses'], list):
-        raise DataValidationError("'courses' must be an array")
-    
-    # Validate course structure
-    for i, course in enumerate(data['courses']):
-        if not isinstance(course, dict):
-            raise DataValidationError(f"Course {i} must be an object")
         
-        if 'assignments' in course and not isinstance(course['assignments'], list):
-            raise DataValidationError(f"Course {i} assignments must be an array")
-        
-        # Validate assignments
-        assignments = course.get('assignments', [])
+        # Assignment progress values are used as-is by preprocessing, so their types are checked here
         for j, assignment in enumerate(assignments):
             if not isinstance(assignment, dict):
                 raise DataValidationError(f"Course {i}, assignment {j} must be an object")
@@ -549,6 +897,15 @@ def validate_input_data(data):
             progress = assignment.get('progress', {})
             if not isinstance(progress, dict):
                 raise DataValidationError(f"Course {i}, assignment {j} progress must be an object")
+            
+            for field in ('totalScore', 'totalTime'):
+                value = progress.get(field)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                    raise DataValidationError(f"Course {i}, assignment {j} {field} must be a number")
+            
+            is_late = progress.get('isLate')
+            if is_late is not None and not isinstance(is_late, bool):
+                raise DataValidationError(f"Course {i}, assignment {j} isLate must be a boolean")
     
     # Validate optional numeric fields
     numeric_fields = ['averageScore', 'completionRate', 'gradeLevel']
@@ -557,10 +914,87 @@ def validate_input_data(data):
             try:
                 float(data[field])
             except (ValueError, TypeError):
-                raise DataValidationError(f"'{field}' must be a number")
+                raise DataValidationError(f"Field {field} must be a number")
     
     return data
 
+# Intervention suggestions per risk level (shared by every response, never mutated)
+HIGH_RISK_INTERVENTION = {
+    "level": "High Risk",
+    "urgency": "Immediate",
+    "suggestions": [
+        "Schedule immediate one-on-one meeting with student",
+        "Contact parents/guardians immediately",
+        "Develop personalized learning plan",
+        "Consider tutoring or additional support services",
+        "Monitor daily progress",
+        "Reduce assignment load if necessary"
+    ],
+    "timeline": "Within 24 hours"
+}
+
+MODERATE_RISK_INTERVENTION = {
+    "level": "Moderate Risk",
+    "urgency": "High",
+    "suggestions": [
+        "Schedule meeting within 3 days",
+        "Provide additional learning resources",
+        "Implement weekly check-ins",
+        "Consider peer mentoring",
+        "Review study habits and time management",
+        "Offer extended deadlines if needed"
+    ],
+    "timeline": "Within 3 days"
+}
+
+LOW_RISK_INTERVENTION = {
+    "level": "Low Risk",
+    "urgency": "Moderate",
+    "suggestions": [
+        "Send encouraging message",
+        "Provide study tips and resources",
+        "Monitor bi-weekly progress",
+        "Encourage participation in study groups",
+        "Offer optional review sessions"
+    ],
+    "timeline": "Within 1 week"
+}
+
+MINIMAL_RISK_INTERVENTION = {
+    "level": "Minimal Risk",
+    "urgency": "Low",
+    "suggestions": [
+        "Continue current support level",
+        "Recognize good performance",
+        "Encourage peer mentoring opportunities",
+        "Monthly progress check-ins"
+    ],
+    "timeline": "Ongoing monitoring"
+}
+
+def prerender_json(obj):
+    """
+    Serialize a static response fragment once so json_response can splice it in as raw JSON.
+    Needs orjson.Fragment (orjson >= 3.9); otherwise the object is returned unchanged.
+    """
+    if orjson is not None and hasattr(orjson, 'Fragment'):
+        return orjson.Fragment(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY))
+    return obj
+
+# (minimum risk score, intervention) pairs, checked from the highest threshold down
+INTERVENTION_THRESHOLDS = (
+    (80, HIGH_RISK_INTERVENTION),
+    (60, MODERATE_RISK_INTERVENTION),
+    (40, LOW_RISK_INTERVENTION)
+)
+
+# Pre-serialized interventions by level, for the response bodies
+INTERVENTION_JSON = {
+    intervention['level']: prerender_json(intervention)
+    for intervention in (HIGH_RISK_INTERVENTION, MODERATE_RISK_INTERVENTION,
+                         LOW_RISK_INTERVENTION, MINIMAL_RISK_INTERVENTION)
+}
+
 def suggest_interventions(risk_score):
     """
     Suggest interventions based on student risk score.
@@ -571,59 +1005,72 @@ def suggest_interventions(risk_score):
     Returns:
         Dictionary with intervention suggestions
     """
-    if risk_score >= 80:
-        return {
-            "level": "High Risk",
-            "urgency": "Immediate",
-            "suggestions": [
-                "Schedule immediate one-on-one meeting with student",
-                "Contact parents/guardians immediately",
-                "Develop personalized learning plan",
-                "Consider tutoring or additional support services",
-                "Monitor daily progress",
-                "Reduce assignment load if necessary"
-            ],
-            "timeline": "Within 24 hours"
-        }
-    elif risk_score >= 60:
-        return {
-            "level": "Moderate Risk",
-            "urgency": "High",
-            "suggestions": [
-                "Schedule meeting within 3 days",
-                "Provide additional learning resources",
-                "Implement weekly check-ins",
-                "Consider peer mentoring",
-                "Review study habits and time management",
-                "Offer extended deadlines if needed"
-            ],
-            "timeline": "Within 3 days"
-        }
-    elif risk_score >= 40:
-        return {
-            "level": "Low Risk",
-            "urgency": "Moderate",
-            "suggestions": [
-                "Send encouraging message",
-                "Provide study tips and resources",
-                "Monitor bi-weekly progress",
-                "Encourage participation in study groups",
-                "Offer optional review sessions"
-            ],
-            "timeline": "Within 1 week"
-        }
-    else:
-        return {
-            "level": "Minimal Risk",
-            "urgency": "Low",
-            "suggestions": [
-                "Continue current support level",
-                "Recognize good performance",
-                "Encourage peer mentoring opportunities",
-                "Monthly progress check-ins"
-            ],
-            "timeline": "Ongoing monitoring"
-        }
+    for threshold, intervention in INTERVENTION_THRESHOLDS:
+        if risk_score >= threshold:
+            return intervention
+    return MINIMAL_RISK_INTERVENTION
+
+if njit is not None:
+    # Compiled eagerly at import for the one signature used; nogil lets batch worker threads run it concurrently
+    @njit(nb.void(readonly_1d(nb.float64), readonly_1d(nb.float64), readonly_1d(nb.int64),
+                  nb.float64[::1], nb.int64[::1], nb.float64[::1]), nogil=True)
+    def _accumulate_monthly_activity(scores, times, months, score_sums, score_counts, time_sums):
+        """Add each assignment's score and time to the totals of its month in a single pass"""
+        for i in range(scores.shape[0]):
+            month = months[i]
+            score_sums[month] += scores[i]
+            score_counts[month] += 1
+            time_sums[month] += times[i]
+else:
+    _accumulate_monthly_activity = None
+
+def aggregate_monthly_activity(scores, times, months, n_months):
+    """
+    Aggregate flattened assignment data by month.
+    Returns (score sums, score counts, time sums), each an array of length n_months.
+    """
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    times = np.ascontiguousarray(times, dtype=np.float64)
+    months = np.ascontiguousarray(months, dtype=np.int64)
+    
+    if _accumulate_monthly_activity is None:
+        return (
+            np.bincount(months, weights=scores, minlength=n_months),
+            np.bincount(months, minlength=n_months),
+            np.bincount(months, weights=times, minlength=n_months)
+        )
+    
+    score_sums = np.zeros(n_months, dtype=np.float64)
+    score_counts = np.zeros(n_months, dtype=np.int64)
+    time_sums = np.zeros(n_months, dtype=np.float64)
+    _accumulate_monthly_activity(scores, times, months, score_sums, score_counts, time_sums)
+    return score_sums, score_counts, time_sums
+
+# One flattened assignment: score, time spent, simulated month index and late flag
+ASSIGNMENT_RECORD_DTYPE = np.dtype([('score', 'f8'), ('time', 'f8'), ('month', 'i8'), ('late', '?')])
+
+def iter_assignment_records(courses):
+    """
+    Yield one ASSIGNMENT_RECORD_DTYPE tuple per assignment of validated course data.
+    The assignment index determines the month (simulated chronological order, cycling through 6 months);
+    missing or null values count as zero / on time.
+    """
+    for course in courses:
+        for assignment_idx, assignment in enumerate(course['assignments']):
+            progress = assignment.get('progress', {})
+            score = progress.get('totalScore')
+            time_spent = progress.get('totalTime')
+            yield (
+                score if score is not None else 0.0,
+                time_spent if time_spent is not None else 0.0,
+                assignment_idx % 6,
+                bool(progress.get('isLate'))
+            )
+
+@lru_cache(maxsize=8)
+def get_feature_index(feature_names):
+    """Map each feature name to its column position (feature_names must be a tuple)"""
+    return {name: position for position, name in enumerate(feature_names)}
 
 def preprocess_student_data_for_prediction(data, feature_names):
     """
@@ -648,109 +1095,54 @@ def preprocess_student_data_for_prediction(data, feature_names):
         if len(feature_names) == 0:
             raise PreprocessingError("Feature names list is empty")
         
-        # Initialize all features with default values
-        processed_data = pd.DataFrame(columns=feature_names, dtype=float)
-        processed_data.loc[0] = 0.0  # Initialize with zeros
+        # Initialize all features with default values, written by position
+        feature_index = get_feature_index(tuple(feature_names))
+        row = np.zeros(len(feature_names), dtype=np.float64)
         
         # Extract relevant information from the request
         courses = data.get('courses', [])
         
         if not courses:
             logger.info("No courses provided, using default values")
-            return processed_data.values
+            return row.astype(np.float32).reshape(1, -1)
         
         # Validate courses data
         if not isinstance(courses, list):
             raise PreprocessingError("Courses must be a list")
         
         # Process assignment data to simulate the CSV structure used in training
-        # We'll aggregate assignment data by simulated months (first 6 months)
-        monthly_scores = [[], [], [], [], [], []]  # For months 1, 2, 3, 4, 5, 6
-        monthly_times = [[], [], [], [], [], []]   # For months 1, 2, 3, 4, 5, 6
+        # Assignments are streamed straight into one typed record array and aggregated by simulated month
+        # (first 6 months). validate_input_data has already checked the structure and value types of every assignment.
+        total_assignments = sum(len(course['assignments']) for course in courses)
+        assignment_records = np.fromiter(
+            iter_assignment_records(courses), dtype=ASSIGNMENT_RECORD_DTYPE, count=total_assignments
+        )
         
-        total_time = 0
-        late_submissions = 0
-        total_assignments = 0
+        total_time = float(assignment_records['time'].sum())
+        late_submissions = int(np.count_nonzero(assignment_records['late']))
         
-        # Process each course and assignment
-        for course_idx, course in enumerate(courses):
-            if not isinstance(course, dict):
-                logger.warning(f"Course {course_idx} is not a dictionary, skipping")
-                continue
-            
-            assignments = course.get('assignments', [])
-            
-            if not isinstance(assignments, list):
-                logger.warning(f"Course {course_idx} assignments is not a list, skipping")
-                continue
-            
-            for assignment_idx, assignment in enumerate(assignments):
-                try:
-                    if not isinstance(assignment, dict):
-                        logger.warning(f"Course {course_idx}, assignment {assignment_idx} is not a dictionary, skipping")
-                        continue
-                    
-                    progress = assignment.get('progress', {})
-                    
-                    if not isinstance(progress, dict):
-                        logger.warning(f"Course {course_idx}, assignment {assignment_idx} progress is not a dictionary, skipping")
-                        continue
-                    
-                    # Get assignment data with validation
-                    score = progress.get('totalScore', 0)
-                    time_spent = progress.get('totalTime', 0)
-                    is_late = progress.get('isLate', False)
-                    
-                    # Validate numeric values
-                    try:
-                        score = float(score) if score is not None else 0
-                        time_spent = float(time_spent) if time_spent is not None else 0
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid numeric values in course {course_idx}, assignment {assignment_idx}, using defaults")
-                        score = 0
-                        time_spent = 0
-                    
-                    # Validate boolean value
-                    if not isinstance(is_late, bool):
-                        is_late = bool(is_late) if is_late is not None else False
-                    
-                    # Accumulate totals
-                    total_time += time_spent
-                    total_assignments += 1
-                    if is_late:
-                        late_submissions += 1
-                    
-                    # Distribute assignments across 6 months for early warning features
-                    # Use assignment index to determine month (simulate chronological order)
-                    month_idx = assignment_idx % 6  # Cycles through 0, 1, 2, 3, 4, 5 (representing months 1, 2, 3, 4, 5, 6)
-                    monthly_scores[month_idx].append(score)
-                    monthly_times[month_idx].append(time_spent)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing course {course_idx}, assignment {assignment_idx}: {str(e)}")
-                    continue
+        # Per-month score sums, score counts and time totals in one pass over the flattened assignments
+        month_score_sums, month_score_counts, month_time_sums = aggregate_monthly_activity(
+            assignment_records['score'], assignment_records['time'], assignment_records['month'], n_months=6
+        )
+        
+        # Running (prefix) score sums and counts give the cumulative average up to each month
+        score_sums_up_to_month = np.cumsum(month_score_sums)
+        score_counts_up_to_month = np.cumsum(month_score_counts)
         
         # Calculate monthly cumulative scores and time spent for first 6 months
         cumulative_scores = []
         monthly_time_totals = []
         
         for month_idx in range(6):
-            # Calculate cumulative average score up to this month
-            all_scores_up_to_month = []
-            all_time_up_to_month = 0
-            
-            for m in range(month_idx + 1):
-                all_scores_up_to_month.extend(monthly_scores[m])
-                all_time_up_to_month += sum(monthly_times[m])
-            
-            # Cumulative average score
-            if all_scores_up_to_month:
-                cumulative_avg = np.mean(all_scores_up_to_month)
+            # Cumulative average score up to this month
+            if score_counts_up_to_month[month_idx]:
+                cumulative_avg = score_sums_up_to_month[month_idx] / score_counts_up_to_month[month_idx]
             else:
                 cumulative_avg = 0
             
             # Time spent in this specific month
-            month_time = sum(monthly_times[month_idx])
+            month_time = month_time_sums[month_idx]
             
             cumulative_scores.append(cumulative_avg)
             monthly_time_totals.append(month_time)
@@ -759,103 +1151,108 @@ def preprocess_student_data_for_prediction(data, feature_names):
             score_col = f'Score_Month_{month_idx + 1}'
             time_col = f'TimeSpent_Month_{month_idx + 1}'
             
-            if score_col in feature_names:
-                processed_data.loc[0, score_col] = cumulative_avg
-            if time_col in feature_names:
-                processed_data.loc[0, time_col] = month_time
+            if score_col in feature_index:
+                row[feature_index[score_col]] = cumulative_avg
+            if time_col in feature_index:
+                row[feature_index[time_col]] = month_time
         
         # Set basic features
-        if 'totalTimeSpentMinutes' in feature_names:
-            processed_data.loc[0, 'totalTimeSpentMinutes'] = total_time
+        if 'totalTimeSpentMinutes' in feature_index:
+            row[feature_index['totalTimeSpentMinutes']] = total_time
         
-        if 'gradeLevel' in feature_names:
+        if 'gradeLevel' in feature_index:
             grade_level = data.get('gradeLevel', 12)
             try:
                 grade_level = int(float(grade_level))
-                processed_data.loc[0, 'gradeLevel'] = grade_level
+                row[feature_index['gradeLevel']] = grade_level
             except (ValueError, TypeError):
-                processed_data.loc[0, 'gradeLevel'] = 12
+                row[feature_index['gradeLevel']] = 12
         
-        if 'late_submission_rate' in feature_names:
+        if 'late_submission_rate' in feature_index:
             if total_assignments > 0:
                 rate = late_submissions / total_assignments
-                processed_data.loc[0, 'late_submission_rate'] = rate
+                row[feature_index['late_submission_rate']] = rate
             else:
-                processed_data.loc[0, 'late_submission_rate'] = 0
+                row[feature_index['late_submission_rate']] = 0
         
         # Calculate early warning features (matching the training pipeline)
         try:
             # Early average score (first 6 months)
-            if 'avg_score_month_1_to_6' in feature_names:
+            if 'avg_score_month_1_to_6' in feature_index:
                 non_zero_scores = [s for s in cumulative_scores if s > 0]
                 if non_zero_scores:
-                    processed_data.loc[0, 'avg_score_month_1_to_6'] = np.mean(non_zero_scores)
+                    row[feature_index['avg_score_month_1_to_6']] = np.mean(non_zero_scores)
                 else:
-                    processed_data.loc[0, 'avg_score_month_1_to_6'] = 0
+                    row[feature_index['avg_score_month_1_to_6']] = 0
             
             # Early average time (first 6 months)
-            if 'avg_time_month_1_to_6' in feature_names:
-                processed_data.loc[0, 'avg_time_month_1_to_6'] = np.mean(monthly_time_totals)
+            if 'avg_time_month_1_to_6' in feature_index:
+                row[feature_index['avg_time_month_1_to_6']] = np.mean(monthly_time_totals)
             
             # Early score variance (consistency indicator)
-            if 'score_variance_month_1_to_6' in feature_names:
+            if 'score_variance_month_1_to_6' in feature_index:
                 non_zero_scores = [s for s in cumulative_scores if s > 0]
                 if len(non_zero_scores) > 1:
-                    processed_data.loc[0, 'score_variance_month_1_to_6'] = np.var(non_zero_scores)
+                    row[feature_index['score_variance_month_1_to_6']] = np.var(non_zero_scores)
                 else:
-                    processed_data.loc[0, 'score_variance_month_1_to_6'] = 0
+                    row[feature_index['score_variance_month_1_to_6']] = 0
             
             # Early time variance
-            if 'time_variance_month_1_to_6' in feature_names:
+            if 'time_variance_month_1_to_6' in feature_index:
                 if len(monthly_time_totals) > 1:
-                    processed_data.loc[0, 'time_variance_month_1_to_6'] = np.var(monthly_time_totals)
+                    row[feature_index['time_variance_month_1_to_6']] = np.var(monthly_time_totals)
                 else:
-                    processed_data.loc[0, 'time_variance_month_1_to_6'] = 0
+                    row[feature_index['time_variance_month_1_to_6']] = 0
             
             # Time-to-score efficiency ratio
-            if 'time_score_ratio_month_1_to_6' in feature_names:
-                avg_score = processed_data.loc[0, 'avg_score_month_1_to_6'] if 'avg_score_month_1_to_6' in feature_names else np.mean([s for s in cumulative_scores if s > 0]) or 1
-                avg_time = processed_data.loc[0, 'avg_time_month_1_to_6'] if 'avg_time_month_1_to_6' in feature_names else np.mean(monthly_time_totals)
+            if 'time_score_ratio_month_1_to_6' in feature_index:
+                avg_score = row[feature_index['avg_score_month_1_to_6']] if 'avg_score_month_1_to_6' in feature_index else np.mean([s for s in cumulative_scores if s > 0]) or 1
+                avg_time = row[feature_index['avg_time_month_1_to_6']] if 'avg_time_month_1_to_6' in feature_index else np.mean(monthly_time_totals)
                 
                 if avg_score > 0:
-                    processed_data.loc[0, 'time_score_ratio_month_1_to_6'] = avg_time / avg_score
+                    row[feature_index['time_score_ratio_month_1_to_6']] = avg_time / avg_score
                 else:
-                    processed_data.loc[0, 'time_score_ratio_month_1_to_6'] = 0
+                    row[feature_index['time_score_ratio_month_1_to_6']] = 0
             
             # Early engagement (proportion of months with activity)
-            if 'engagement_month_1_to_6' in feature_names:
+            if 'engagement_month_1_to_6' in feature_index:
                 active_months = sum(1 for t in monthly_time_totals if t > 0)
-                processed_data.loc[0, 'engagement_month_1_to_6'] = active_months / 6
+                row[feature_index['engagement_month_1_to_6']] = active_months / 6
             
             # Weighted early score (more recent months weighted higher)
-            if 'weighted_score_month_1_to_6' in feature_names:
+            if 'weighted_score_month_1_to_6' in feature_index:
                 weights = np.array([1, 2, 3, 4, 5, 6])
                 valid_scores = [(score, weight) for score, weight in zip(cumulative_scores, weights) if score > 0]
                 
                 if valid_scores:
                     weighted_sum = sum(score * weight for score, weight in valid_scores)
                     weight_sum = sum(weight for _, weight in valid_scores)
-                    processed_data.loc[0, 'weighted_score_month_1_to_6'] = weighted_sum / weight_sum
+                    row[feature_index['weighted_score_month_1_to_6']] = weighted_sum / weight_sum
                 else:
-                    processed_data.loc[0, 'weighted_score_month_1_to_6'] = 0
+                    row[feature_index['weighted_score_month_1_to_6']] = 0
             
             # Early trend (slope of scores over first 6 months)
-            if 'score_trend_month_1_to_6' in feature_names:
+            if 'score_trend_month_1_to_6' in feature_index:
                 valid_data = [(i+1, score) for i, score in enumerate(cumulative_scores) if score > 0]
                 
                 if len(valid_data) >= 2:
-                    months, scores = zip(*valid_data)
-                    slope, _, _, _, _ = stats.linregress(months, scores)
-                    processed_data.loc[0, 'score_trend_month_1_to_6'] = slope if np.isfinite(slope) else 0
+                    # Closed-form least-squares slope; months are distinct, so the denominator is positive
+                    n = len(valid_data)
+                    sum_x = sum(month for month, _ in valid_data)
+                    sum_y = sum(score for _, score in valid_data)
+                    sum_xy = sum(month * score for month, score in valid_data)
+                    sum_xx = sum(month * month for month, _ in valid_data)
+                    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+                    row[feature_index['score_trend_month_1_to_6']] = slope if np.isfinite(slope) else 0
                 else:
-                    processed_data.loc[0, 'score_trend_month_1_to_6'] = 0
+                    row[feature_index['score_trend_month_1_to_6']] = 0
             
             # Override with provided summary data if available
             if 'averageScore' in data:
                 try:
                     avg_score = float(data['averageScore'])
-                    if 'avg_score_month_1_to_6' in feature_names and np.isfinite(avg_score):
-                        processed_data.loc[0, 'avg_score_month_1_to_6'] = avg_score
+                    if 'avg_score_month_1_to_6' in feature_index and np.isfinite(avg_score):
+                        row[feature_index['avg_score_month_1_to_6']] = avg_score
                 except (ValueError, TypeError):
                     logger.warning("Invalid averageScore provided, ignoring")
             
@@ -864,8 +1261,8 @@ def preprocess_student_data_for_prediction(data, feature_names):
                     completion_rate = float(data['completionRate'])
                     if 0 <= completion_rate <= 100:
                         completion_ratio = completion_rate / 100.0
-                        if 'engagement_month_1_to_6' in feature_names:
-                            processed_data.loc[0, 'engagement_month_1_to_6'] = completion_ratio
+                        if 'engagement_month_1_to_6' in feature_index:
+                            row[feature_index['engagement_month_1_to_6']] = completion_ratio
                     else:
                         logger.warning("Completion rate out of range (0-100), ignoring")
                 except (ValueError, TypeError):
@@ -875,18 +1272,12 @@ def preprocess_student_data_for_prediction(data, feature_names):
             logger.error(f"Error calculating early warning features: {str(e)}")
             # Continue with default values
         
-        # Fill any remaining NaN values with 0
-        processed_data = processed_data.fillna(0)
-        
-        # Validate final data
-        result = processed_data.values
-        if result.shape[1] != len(feature_names):
-            raise PreprocessingError(f"Processed data has {result.shape[1]} features but expected {len(feature_names)}")
+        # Features are built in float64 and handed to the model as float32, the precision
+        # the tree ensembles compare in; values out of float32 range become inf and are zeroed
+        result = row.astype(np.float32).reshape(1, -1)
         
-        # Check for any remaining invalid values
-        if not np.all(np.isfinite(result)):
-            logger.warning("Some non-finite values found, replacing with zeros")
-            result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+        # Replace any NaN or infinite values with zeros in place
+        np.nan_to_num(result, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
         
         return result
         
@@ -923,7 +1314,7 @@ def predict():
         
         # Get and validate request data
         try:
-            data = request.get_json(force=True)
+            data = read_json_body()
         except Exception as e:
             logger.error(f"Invalid JSON in request: {str(e)}")
             return jsonify({
@@ -992,16 +1383,12 @@ def predict():
 
         # Make prediction
         try:
-            prediction = current_model.predict(processed_data)[0] if not hasattr(current_model, 'named_steps') else current_model.predict(pd.DataFrame(processed_data, columns=current_features))[0]
-            if hasattr(current_model, 'predict_proba'):
-                if hasattr(current_model, 'named_steps'):
-                    proba = current_model.predict_proba(pd.DataFrame(processed_data, columns=current_features))[0]
-                    classes = list(current_model.classes_)
-                else:
-                    proba = current_model.predict_proba(processed_data)[0]
-                    classes = list(current_model.classes_)
-            else:
+            if not hasattr(current_model, 'predict_proba'):
                 raise PredictionError("Model lacks predict_proba")
+            proba = np.array(cached_row_probabilities(current_model_type, processed_data.tobytes()))
+            classes = list(current_model.classes_)
+            # Same decision rule as predict(): the most probable class
+            prediction = classes[int(np.argmax(proba))]
             at_risk_index = classes.index(1)
             not_at_risk_index = classes.index(0)
         except Exception as e:
@@ -1021,14 +1408,8 @@ def predict():
             logger.error(f"Error calculating risk score: {str(e)}")
             risk_score = 50  # Default fallback
         
-        # Get feature importance
-        feature_importances = None
-        try:
-            if hasattr(current_model, 'feature_importances_'):
-                importances = dict(zip(current_features, current_model.feature_importances_))
-                feature_importances = sorted(importances.items(), key=lambda x: x[1], reverse=True)[:5]
-        except Exception as e:
-            logger.warning(f"Could not get feature importances: {str(e)}")
+        # Top feature importances, built once when the model was loaded
+        risk_factors = models[current_model_type].get('risk_factors')
 
         # Get suggested interventions
         try:
@@ -1047,14 +1428,14 @@ def predict():
             'probability': float(proba[at_risk_index]),
             'risk_score': risk_score,
             'risk_level': interventions['level'],
-            'intervention': interventions,
+            'intervention': INTERVENTION_JSON.get(interventions['level'], interventions),
             'model_used': requested_model_id,
             'model_name': AVAILABLE_MODELS[requested_model_id]['name']
         }
 
         # Add feature importances if available
-        if feature_importances:
-            response['risk_factors'] = [{'name': factor[0], 'importance': float(factor[1])} for factor in feature_importances]
+        if risk_factors:
+            response['risk_factors'] = risk_factors
 
         # Restore original model if switched
         if model_switched:
@@ -1062,7 +1443,7 @@ def predict():
             logger.info(f"Restored original model {original_model_type}")
 
         logger.info(f"Prediction successful - Risk Score: {risk_score}, At Risk: {prediction == 1}, Model: {requested_model_id}")
-        return jsonify(response)
+        return json_response(response)
         
     except Exception as e:
         # Restore original model if switched
@@ -1075,6 +1456,17 @@ def predict():
             'message': 'An unexpected error occurred. Please try again later.'
         }), 500
 
+def prepare_batch_row(student_data, feature_names):
+    """
+    Validate and preprocess one student of a batch request.
+    Returns (feature_row, None) on success or (None, error) on failure.
+    """
+    try:
+        validated_data = validate_input_data(student_data)
+        return preprocess_student_data_for_prediction(validated_data, feature_names)[0], None
+    except Exception as e:
+        return None, e
+
 @app.route('/api/predict/batch', methods=['POST'])
 def predict_batch():
     """
@@ -1108,7 +1500,7 @@ def predict_batch():
         
         # Get and validate request data
         try:
-            data = request.get_json(force=True)
+            data = read_json_body()
         except Exception as e:
             logger.error(f"Invalid JSON in request: {str(e)}")
             return jsonify({
@@ -1142,24 +1534,49 @@ def predict_batch():
                 'message': 'Maximum 100 students per batch request'
             }), 400
         
-        # Process each student
+        # Validate and preprocess every student first so the model runs once on the whole batch
         results = []
         failed_predictions = []
+        batch_rows = []
+        batch_students = []
+        
+        # Students are independent, so they are prepared concurrently (results keep request order)
+        prepared_rows = _batch_executor.map(prepare_batch_row, students, repeat(current_features))
+        
+        for i, (student_data, (feature_row, error)) in enumerate(zip(students, prepared_rows)):
+            if feature_row is not None:
+                batch_rows.append(feature_row)
+                batch_students.append((i, student_data))
+            else:
+                error_info = {
+                    'studentId': student_data.get('studentId', f'student_{i}'),
+                    'studentName': student_data.get('studentName', 'Unknown'),
+                    'error': str(error)
+                }
+                failed_predictions.append(error_info)
+                logger.warning(f"Failed to predict for student {i}: {str(error)}")
         
-        for i, student_data in enumerate(students):
+        if batch_rows:
+            # Make predictions for the whole batch with a single predict_proba call
             try:
-                # Validate student data
-                validated_data = validate_input_data(student_data)
-                
-                # Preprocess student data
-                processed_data = preprocess_student_data_for_prediction(validated_data, current_features)
-                
-                # Make prediction
-                prediction = current_model.predict(processed_data)[0] if not hasattr(current_model, 'named_steps') else current_model.predict(pd.DataFrame(processed_data, columns=current_features))[0]
-                proba = current_model.predict_proba(pd.DataFrame(processed_data, columns=current_features))[0] if hasattr(current_model, 'named_steps') else current_model.predict_proba(processed_data)[0]
-                classes = list(current_model.classes_)
-                at_risk_index = classes.index(1)
-                risk_score = int(proba[at_risk_index] * 100)
+                probabilities = predict_probabilities(models[current_model_type], np.vstack(batch_rows).astype(np.float32, copy=False))
+                classes = current_model.classes_
+                at_risk_index = list(classes).index(1)
+                # Same decision rule as predict(): the most probable class
+                predictions = classes[np.argmax(probabilities, axis=1)]
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {str(e)}")
+                for i, student_data in batch_students:
+                    failed_predictions.append({
+                        'studentId': student_data.get('studentId', f'student_{i}'),
+                        'studentName': student_data.get('studentName', 'Unknown'),
+                        'error': str(e)
+                    })
+                batch_students = []
+            
+            for position, (i, student_data) in enumerate(batch_students):
+                probability = float(probabilities[position, at_risk_index])
+                risk_score = int(probability * 100)
                 
                 # Get interventions
                 interventions = suggest_interventions(risk_score)
@@ -1168,23 +1585,14 @@ def predict_batch():
                 student_result = {
                     'studentId': student_data.get('studentId', f'student_{i}'),
                     'studentName': student_data.get('studentName', 'Unknown'),
-                    'is_at_risk': prediction == 1,
-                    'probability': proba[at_risk_index],
+                    'is_at_risk': bool(predictions[position] == 1),
+                    'probability': probability,
                     'risk_score': risk_score,
                     'risk_level': interventions['level'],
-                    'intervention': interventions
+                    'intervention': INTERVENTION_JSON.get(interventions['level'], interventions)
                 }
                 
                 results.append(student_result)
-                
-            except Exception as e:
-                error_info = {
-                    'studentId': student_data.get('studentId', f'student_{i}'),
-                    'studentName': student_data.get('studentName', 'Unknown'),
-                    'error': str(e)
-                }
-                failed_predictions.append(error_info)
-                logger.warning(f"Failed to predict for student {i}: {str(e)}")
         
         # Calculate summary statistics
         total_students = len(results)
@@ -1209,7 +1617,7 @@ def predict_batch():
             response['failed_predictions'] = failed_predictions
         
         logger.info(f"Batch prediction completed - {len(results)} successful, {len(failed_predictions)} failed")
-        return jsonify(response)
+        return json_response(response)
         
     except Exception as e:
         error_msg = f"Unexpected error in batch predict endpoint: {str(e)}"
@@ -1237,17 +1645,8 @@ def predict_from_csv():
                 'message': 'The prediction model is not loaded. Please contact the administrator.'
             }), 503
         
-        # Import prediction functions
-        try:
-            import sys
-            import os
-            # Add the parent directory to Python path to find ml module
-            parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            if parent_dir not in sys.path:
-                sys.path.insert(0, parent_dir)
-            from ml.predict import predict_risk_from_raw_data
-        except ImportError as e:
-            logger.error(f"Could not import prediction functions: {str(e)}")
+        # The prediction pipeline is imported once at startup
+        if _predict_fn is None:
             return jsonify({
                 'error': 'Prediction pipeline not available',
                 'message': 'The CSV prediction pipeline is not available.'
@@ -1289,31 +1688,39 @@ def predict_from_csv():
         try:
             logger.info("Starting CSV-based prediction pipeline...")
             
-            # Ensure we have the ml module in path and import the prediction function
-            import sys
-            import os
-            parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            if parent_dir not in sys.path:
-                sys.path.insert(0, parent_dir)
-            from ml.predict import predict_risk_from_raw_data
-            
-            # Generate timestamp for output file and ensure it goes to output directory
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
-            
-            # Create output directory if it doesn't exist
-            os.makedirs(output_dir, exist_ok=True)
-            
-            output_path = os.path.join(output_dir, f"risk_predictions_{timestamp}.csv")
+            # One pipeline run at a time per worker; other runs are turned away rather than queued
+            if not _pipeline_lock.acquire(blocking=False):
+                response = jsonify({
+                    'error': 'Prediction pipeline busy',
+                    'message': 'Another prediction run is in progress. Please retry shortly.'
+                })
+                response.headers['Retry-After'] = '30'
+                return response, 503
+            temp_path = None
+            try:
+                # Ensure the output goes to the output directory, under a name no other run can take
+                output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+                os.makedirs(output_dir, exist_ok=True)
+                timestamp, temp_path, output_path = reserve_predictions_output(output_dir)
             
-            # Call the prediction function with custom parameters if provided
-            predictions_df = predict_risk_from_raw_data(
-                data_dir=data_dir, 
-                output_path=output_path,
-                model_path=model_path,
-                scaler_path=scaler_path if model_path else None,
-                features_path=features_path if model_path else None
-            )
+                # Call the prediction function with custom parameters if provided
+                predictions_df = _predict_fn(
+                    data_dir=data_dir, 
+                    output_path=temp_path,
+                    model_path=model_path,
+                    scaler_path=scaler_path if model_path else None,
+                    features_path=features_path if model_path else None
+                )
+                
+                if predictions_df is not None:
+                    # Arrow copy first, then publish the finished CSV in one rename, so the read
+                    # endpoints never see a partial file
+                    write_predictions_arrow(predictions_df, output_path)
+                    os.replace(temp_path, output_path)
+            finally:
+                _pipeline_lock.release()
+                if temp_path is not None and os.path.exists(temp_path):
+                    os.remove(temp_path)
             
             if predictions_df is None:
                 return jsonify({
@@ -1343,22 +1750,21 @@ def predict_from_csv():
             available_columns = [col for col in response_columns if col in predictions_df.columns]
             response_data = predictions_df[available_columns].copy()
             
-            # Convert to records format and ensure JSON serializable types
-            predictions_list = response_data.to_dict('records')
-            predictions_list = convert_to_json_serializable(predictions_list)
-            
             # Calculate summary statistics
             total_predictions = len(predictions_df)
             # Check for at risk using the risk_status column (more reliable)
             if 'risk_status' in predictions_df.columns:
-                at_risk_count = (predictions_df['risk_status'] == 'At Risk').sum()
+                at_risk_count = int(np.count_nonzero((predictions_df['risk_status'] == 'At Risk').to_numpy()))
             else:
                 # Fallback to at_risk_prediction column
-                at_risk_count = (predictions_df['at_risk_prediction'] == 1).sum()
+                at_risk_count = int(np.count_nonzero(predictions_df['at_risk_prediction'].to_numpy() == 1))
                 
-            # Convert confidence distribution to JSON serializable format
-            confidence_distribution = predictions_df['prediction_confidence'].value_counts().to_dict()
-            confidence_distribution = convert_to_json_serializable(confidence_distribution)
+            # Confidence distribution with native keys and counts
+            confidence_distribution = {
+                str(level): int(count)
+                for level, count in predictions_df['prediction_confidence'].value_counts().items()
+                if count  # categoricals also report unused categories
+            }
 
             # Ensure we have a risk score probability for class 1
             if 'risk_score' in predictions_df.columns:
@@ -1369,38 +1775,33 @@ def predict_from_csv():
                 # Fallback: use 0 vector
                 risk_probs = pd.Series([0.0]*len(predictions_df))
 
-            # Define bucket thresholds (probability scale 0-1)
-            high_mask = risk_probs >= 0.70
-            medium_mask = (risk_probs >= 0.55) & (risk_probs < 0.70)
-            low_mask = (risk_probs >= 0.45) & (risk_probs < 0.55)
-            minimal_mask = risk_probs < 0.45
+            # Bucket every probability once and count buckets in a single pass;
+            # missing probabilities are labelled 'minimal' but fall in no bucket count
+            risk_values = risk_probs.to_numpy()
+            bucket_codes = risk_bucket_codes(risk_values)
+            bucket_totals = np.bincount(bucket_codes[~np.isnan(risk_values)], minlength=len(RISK_BUCKET_LABELS))
 
             bucket_counts = {
-                'high': int(high_mask.sum()),
-                'medium': int(medium_mask.sum()),
-                'low': int(low_mask.sum()),
-                'minimal': int(minimal_mask.sum())
+                'high': int(bucket_totals[3]),
+                'medium': int(bucket_totals[2]),
+                'low': int(bucket_totals[1]),
+                'minimal': int(bucket_totals[0])
             }
-            # Ensure bucket counts are JSON serializable
-            bucket_counts = convert_to_json_serializable(bucket_counts)
 
             # Optional: annotate each prediction with bucket
-            def bucket_label(p):
-                if p >= 0.70: return 'high'
-                if p >= 0.55: return 'medium'
-                if p >= 0.45: return 'low'
-                return 'minimal'
             # Add only if not already present
             if 'risk_bucket' not in response_data.columns and len(response_data):
-                response_data['risk_bucket'] = risk_probs.apply(bucket_label)
-                predictions_list = response_data.to_dict('records')
-                predictions_list = convert_to_json_serializable(predictions_list)
+                response_data['risk_bucket'] = RISK_BUCKET_LABELS[bucket_codes]
+
+            # Convert to records format with JSON serializable types, once the bucket is attached.
+            # Only the rows returned in the response are converted (limit response size)
+            predictions_list = frame_to_records(response_data.head(50))
 
-            # Convert summary data to JSON serializable format
+            # Summary counts are native ints already, so no conversion pass is needed
             summary = {
-                'total_student_courses': convert_to_json_serializable(total_predictions),
-                'at_risk_count': convert_to_json_serializable(at_risk_count),
-                'at_risk_percentage': convert_to_json_serializable(at_risk_count / total_predictions * 100) if total_predictions > 0 else 0,
+                'total_student_courses': total_predictions,
+                'at_risk_count': at_risk_count,
+                'at_risk_percentage': at_risk_count / total_predictions * 100 if total_predictions > 0 else 0,
                 'confidence_distribution': confidence_distribution,
                 'risk_bucket_counts': bucket_counts
             }
@@ -1409,25 +1810,25 @@ def predict_from_csv():
             final_response = {
                 'success': True,
                 'message': f'Generated predictions for {total_predictions} students',
-                'predictions_count': convert_to_json_serializable(total_predictions),
-                'at_risk_count': convert_to_json_serializable(at_risk_count),
+                'predictions_count': total_predictions,
+                'at_risk_count': at_risk_count,
                 'output_file': output_path,
                 'timestamp': timestamp,
                 'model_used': model_id if model_id else 'default',
                 'data_directory': data_dir if data_dir else 'default',
                 'summary': {
-                    'total_students': convert_to_json_serializable(total_predictions),
-                    'at_risk_students': convert_to_json_serializable(at_risk_count),
-                    'not_at_risk_students': convert_to_json_serializable(total_predictions - at_risk_count),
-                    'at_risk_percentage': convert_to_json_serializable(round((at_risk_count / total_predictions) * 100, 1)) if total_predictions > 0 else 0,
+                    'total_students': total_predictions,
+                    'at_risk_students': at_risk_count,
+                    'not_at_risk_students': total_predictions - at_risk_count,
+                    'at_risk_percentage': round((at_risk_count / total_predictions) * 100, 1) if total_predictions > 0 else 0,
                     'confidence_distribution': confidence_distribution,
                     'risk_bucket_counts': bucket_counts
                 },
-                'predictions': predictions_list[:50] if len(predictions_list) > 50 else predictions_list  # Limit response size
+                'predictions': predictions_list
             }
             
             logger.info(f"CSV prediction completed - {total_predictions} predictions generated")
-            return jsonify(final_response)
+            return json_response(final_response)
             
         except Exception as e:
             error_msg = f"Error formatting CSV prediction results: {str(e)}"
@@ -1451,6 +1852,202 @@ def predict_from_csv():
             'message': 'An unexpected error occurred. Please try again later.'
         }), 500
 
+@lru_cache(maxsize=4)
+def scan_latest_predictions_file(output_dir, dir_mtime_ns):
+    """
+    Glob the output directory for the newest risk_predictions_*.csv file.
+    dir_mtime_ns is only part of the cache key: adding or removing files invalidates the entry.
+    """
+    csv_files = glob.glob(os.path.join(glob.escape(output_dir), 'risk_predictions_*.csv'))
+    
+    # Get the latest file (the name includes the timestamp)
+    return max(csv_files, default=None)
+
+def find_latest_predictions_file(output_dir=OUTPUT_DIR):
+    """Return the path of the newest risk_predictions_*.csv file, or None if there is none"""
+    try:
+        dir_mtime_ns = os.stat(output_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return scan_latest_predictions_file(output_dir, dir_mtime_ns)
+
+def reserve_predictions_output(output_dir):
+    """
+    Reserve a unique risk_predictions_<timestamp>.csv name, across threads and worker processes.
+    Returns (timestamp, temp_path, output_path): temp_path is created with O_EXCL under a hidden name
+    the predictions glob skips; the finished CSV is written there and renamed to output_path.
+    """
+    while True:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        output_name = f"risk_predictions_{timestamp}.csv"
+        temp_path = os.path.join(output_dir, f".{output_name}.tmp")
+        try:
+            os.close(os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue  # Another run took this microsecond
+        return timestamp, temp_path, os.path.join(output_dir, output_name)
+
+def write_file_atomically(write, final_path):
+    """
+    Call write(temp_path) on a temporary file in final_path's directory, then rename it into place.
+    os.replace is atomic, so readers in any thread or worker process see either the previous
+    file or the complete new one, never a partially written file.
+    """
+    directory, name = os.path.split(final_path)
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory or '.')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def write_predictions_arrow(predictions_df, csv_path):
+    """
+    Write an Arrow IPC (Feather v2) copy of a predictions CSV next to it.
+    The read endpoints prefer this copy since it loads without re-parsing text.
+    Returns the Arrow file path, or None if it could not be written.
+    """
+    if feather is None:
+        return None
+    
+    arrow_path = os.path.splitext(csv_path)[0] + '.arrow'
+    try:
+        # Stored uncompressed so readers can memory-map it without a decode step
+        write_file_atomically(
+            lambda path: feather.write_feather(predictions_df.reset_index(drop=True), path, compression='uncompressed'),
+            arrow_path
+        )
+        return arrow_path
+    except Exception as e:
+        logger.warning(f"Could not write Arrow copy of predictions to {arrow_path}: {str(e)}")
+        return None
+
+# Columns of a predictions file that the risk endpoints read; everything else is skipped on load
+PREDICTION_COLUMNS = [
+    'studentId', 'courseId', 'gradeLevel',
+    'risk_score', 'risk_status', 'at_risk_prediction', 'at_risk_probability', 'prediction_confidence',
+    'finalScore', 'totalTimeSpentMinutes', 'late_submission_rate',
+    'declining_performance', 'inconsistent_performance', 'low_engagement'
+]
+PREDICTION_COLUMN_DTYPES = {
+    'studentId': str,
+    'courseId': str,
+    'risk_status': 'category',
+    'prediction_confidence': 'category'
+}
+
+def load_predictions_file(file_path):
+    """
+    Load the PREDICTION_COLUMNS of a predictions file, reusing the parsed DataFrame while the file is unchanged.
+    An up-to-date Arrow copy of the CSV is memory-mapped instead of parsing the CSV;
+    a CSV without a readable one gets it written (atomically) on first access.
+    The returned DataFrame is shared between requests and must not be modified.
+    """
+    source_path = file_path
+    if feather is not None:
+        arrow_path = os.path.splitext(file_path)[0] + '.arrow'
+        if os.path.exists(arrow_path) and os.path.getmtime(arrow_path) >= os.path.getmtime(file_path):
+            source_path = arrow_path
+    
+    cache_key = (source_path, os.path.getmtime(source_path))
+    df = _predictions_cache.get(cache_key)
+    if df is None:
+        if source_path != file_path:
+            try:
+                table = feather.read_table(source_path, memory_map=True)
+                table = table.select([name for name in PREDICTION_COLUMNS if name in table.column_names])
+                df = table.to_pandas(split_blocks=True, self_destruct=True)
+            except (ValueError, OSError) as e:
+                # A damaged copy (ArrowInvalid is a ValueError) is rebuilt from the CSV below
+                logger.warning(f"Could not read Arrow copy {source_path}, parsing the CSV instead: {str(e)}")
+                source_path = file_path
+        if source_path == file_path:
+            if feather is not None:
+                # Arrow's multithreaded reader only takes a list of columns, so intersect with the header
+                header = pd.read_csv(file_path, nrows=0).columns
+                df = pd.read_csv(
+                    file_path,
+                    engine='pyarrow',
+                    usecols=[name for name in header if name in PREDICTION_COLUMNS],
+                    dtype={name: dtype for name, dtype in PREDICTION_COLUMN_DTYPES.items() if name in header}
+                )
+            else:
+                df = pd.read_csv(
+                    file_path,
+                    usecols=lambda name: name in PREDICTION_COLUMNS,
+                    dtype=PREDICTION_COLUMN_DTYPES
+                )
+            arrow_path = write_predictions_arrow(df, file_path)
+            if arrow_path is not None:
+                source_path = arrow_path
+            cache_key = (source_path, os.path.getmtime(source_path))
+        # Only the latest file is ever served, so drop older entries
+        _predictions_cache.clear()
+        _predictions_cache[cache_key] = df
+    return df
+
+@lru_cache(maxsize=4)
+def read_name_lookup(csv_path, mtime_ns):
+    """
+    Parse an id -> name mapping from a CSV file as a name Series indexed by id.
+    mtime_ns is only part of the cache key, so editing the file invalidates the entry.
+    """
+    # Only the two lookup columns are parsed, as plain strings
+    lookup_df = pd.read_csv(
+        csv_path,
+        usecols=['id', 'name'],
+        dtype=str,
+        engine='pyarrow' if feather is not None else 'c'
+    )
+    names = lookup_df.set_index('id')['name']
+    # Later rows win for repeated ids, and a unique index is required for reindex
+    return names[~names.index.duplicated(keep='last')]
+
+def load_name_lookup(csv_path):
+    """Load an id -> name Series from a CSV file, cached until the file changes"""
+    return read_name_lookup(csv_path, os.stat(csv_path).st_mtime_ns)
+
+def course_risk_columns(df):
+    """
+    Native column lists served by the course-data endpoint for a loaded predictions frame.
+    Built once per frame: load_predictions_file returns the same object until the file changes.
+    """
+    cached_frame, cached_columns = _course_columns_cache.get('entry', (None, None))
+    if cached_frame is df:
+        return cached_columns
+    
+    def column(name, default):
+        if name in df.columns:
+            return df[name].tolist()
+        return [default] * len(df)
+    
+    def text_column(name, default):
+        if name in df.columns:
+            return df[name].to_numpy().astype(str).tolist()
+        return [default] * len(df)
+    
+    columns = {
+        'studentId': text_column('studentId', ''),
+        'courseId': text_column('courseId', ''),
+        'risk_score': column('risk_score', 0),
+        'at_risk_prediction': column('at_risk_prediction', 1),
+        'at_risk_probability': column('at_risk_probability', 0),
+        'risk_status': text_column('risk_status', 'Unknown'),
+        'prediction_confidence': text_column('prediction_confidence', 'Unknown'),
+        'finalScore': column('finalScore', 0),
+        'late_submission_rate': column('late_submission_rate', 0),
+        'totalTimeSpentMinutes': column('totalTimeSpentMinutes', 0),
+        'declining_performance': column('declining_performance', 0),
+        'low_engagement': column('low_engagement', 0),
+        'inconsistent_performance': column('inconsistent_performance', 0)
+    }
+    # Stored as one tuple so concurrent requests never pair a frame with another frame's columns
+    _course_columns_cache['entry'] = (df, columns)
+    return columns
+
 @app.route('/api/risk/students', methods=['GET'])
 def get_at_risk_students():
     """
@@ -1459,33 +2056,29 @@ def get_at_risk_students():
     """
     try:
         # Find the latest CSV prediction file in the output directory
-        output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output')
-        csv_files = []
-        
-        if os.path.exists(output_dir):
-            for file in os.listdir(output_dir):
-                if file.startswith('risk_predictions_') and file.endswith('.csv'):
-                    csv_files.append(file)
-        else:
-            logger.error(f"Output directory not found: {output_dir}")
+        if not os.path.exists(OUTPUT_DIR):
+            logger.error(f"Output directory not found: {OUTPUT_DIR}")
             return jsonify({
                 'error': 'Output directory not found',
                 'message': 'Predictions output directory does not exist'
             }), 404
         
-        if not csv_files:
+        latest_file_path = find_latest_predictions_file()
+        if latest_file_path is None:
             return jsonify({
                 'error': 'No predictions available',
                 'message': 'No risk prediction CSV files found. Please run predictions first.'
             }), 404
         
-        # Get the latest file (sorted by name which includes timestamp)
-        latest_file = sorted(csv_files, reverse=True)[0]
-        latest_file_path = os.path.join(output_dir, latest_file)
+        latest_file = os.path.basename(latest_file_path)
+        
+        # Read the predictions file and both lookup CSVs concurrently (each cached until its file changes)
+        predictions_future = _io_executor.submit(load_predictions_file, latest_file_path)
+        students_future = _io_executor.submit(load_name_lookup, os.path.join(DATA_DIR, 'students.csv'))
+        courses_future = _io_executor.submit(load_name_lookup, os.path.join(DATA_DIR, 'courses.csv'))
         
-        # Read the CSV file
         try:
-            df = pd.read_csv(latest_file_path)
+            df = predictions_future.result()
         except Exception as e:
             logger.error(f"Error reading CSV file {latest_file_path}: {str(e)}")
             return jsonify({
@@ -1495,101 +2088,113 @@ def get_at_risk_students():
         
         # Load student and course lookup data
         try:
-            # Read students CSV for name mapping
-            students_df = pd.read_csv('../../data/students.csv')
-            student_lookup = dict(zip(students_df['id'].astype(str), students_df['name']))
-            
-            # Read courses CSV for course name mapping
-            courses_df = pd.read_csv('../../data/courses.csv')
-            course_lookup = dict(zip(courses_df['id'], courses_df['name']))
+            # Student and course name mappings (cached until the CSVs change)
+            student_lookup = students_future.result()
+            course_lookup = courses_future.result()
             
             logger.info(f"Loaded {len(student_lookup)} student names and {len(course_lookup)} course names")
         except Exception as e:
             logger.warning(f"Could not load student/course lookup data: {str(e)}")
-            student_lookup = {}
-            course_lookup = {}
+            student_lookup = pd.Series(dtype=object)
+            course_lookup = pd.Series(dtype=object)
         
         # Filter for at-risk students: prediction == 1 (at risk) OR probability threshold
         at_risk_df = df[
             (df['at_risk_prediction'] == 1) |
             (df.get('risk_score', df.get('at_risk_probability', 0)) >= 0.70)
         ].copy()
-          # Convert to list of dictionaries for frontend consumption
-        at_risk_students = []
-        for _, row in at_risk_df.iterrows():
-            student_id = str(row.get('studentId', ''))
-            course_id = str(row.get('courseId', ''))
-            
-            # Get actual names from lookup tables
-            student_name = student_lookup.get(student_id, f'Student {student_id}')
-            course_name = course_lookup.get(course_id, f'Course {course_id}')
-            
-            student = {
-                'id': student_id,
-                'studentId': student_id,
-                'name': student_name,  # Add the actual student name
-                'courseId': course_id,
-                'courseName': course_name,  # Add the actual course name
-                'gradeLevel': convert_to_json_serializable(row.get('gradeLevel', 12)),
-                'mlRiskScore': convert_to_json_serializable(row.get('risk_score', 0) * 100),  # Convert to percentage
-                'mlRiskLevel': str(row.get('risk_status', 'Unknown')).lower(),
-                'isAtRisk': convert_to_json_serializable(row.get('at_risk_prediction', 0) == 1),
-                'probability': convert_to_json_serializable(row.get('at_risk_probability', 0)),
-                'confidence': str(row.get('prediction_confidence', 'Unknown')),
-                'finalScore': convert_to_json_serializable(row.get('finalScore', 0)),
-                'totalTimeSpentMinutes': convert_to_json_serializable(row.get('totalTimeSpentMinutes', 0)),
-                'lateSubmissionRate': convert_to_json_serializable(row.get('late_submission_rate', 0)),
-                'performance': convert_to_json_serializable(row.get('finalScore', 0)),
-                'completion': convert_to_json_serializable(min(100, float(row.get('totalTimeSpentMinutes', 0)) / 10)),  # Rough estimate
-                'lastActive': None,  # Not available in CSV
-                'mlRiskFactors': []  # We'll populate this based on data patterns
-            }
-            
-            # Generate risk factors based on the data
-            risk_factors = []
-            if row.get('late_submission_rate', 0) > 0.3:
-                risk_factors.append('High Late Submission Rate')
-            if row.get('finalScore', 100) < 60:
-                risk_factors.append('Low Academic Performance')
-            if row.get('totalTimeSpentMinutes', 1000) < 300:
-                risk_factors.append('Low Engagement')
-            if row.get('declining_performance', 0) == 1:
-                risk_factors.append('Declining Performance')
-            if row.get('inconsistent_performance', 0) == 1:
-                risk_factors.append('Inconsistent Performance')
-            if row.get('low_engagement', 0) == 1:
-                risk_factors.append('Low Engagement Pattern')
-            
-            student['mlRiskFactors'] = risk_factors
-            at_risk_students.append(student)
         
-        # Sort by risk score (highest first)
-        at_risk_students.sort(key=lambda x: x['mlRiskScore'], reverse=True)
+        # Order rows by risk score (highest first) so records are emitted already sorted
+        order = np.argsort(-column_or_default(at_risk_df, 'risk_score', 0), kind='stable')
+        at_risk_df = at_risk_df.iloc[order].reset_index(drop=True)
+        
+        # Evaluate every risk-factor rule at once, packed as one bitmask per row
+        risk_factor_code_values = risk_factor_codes(
+            column_or_default(at_risk_df, 'late_submission_rate', 0),
+            column_or_default(at_risk_df, 'finalScore', 100),
+            column_or_default(at_risk_df, 'totalTimeSpentMinutes', 1000),
+            column_or_default(at_risk_df, 'declining_performance', 0),
+            column_or_default(at_risk_df, 'inconsistent_performance', 0),
+            column_or_default(at_risk_df, 'low_engagement', 0)
+        )
+        
+        def raw_column(column, default):
+            # Like row.get(): missing columns use the default, missing values stay NaN
+            if column in at_risk_df.columns:
+                return at_risk_df[column].to_numpy()
+            return np.full(len(at_risk_df), default)
+        
+        # Build every output column as a list of native values, then zip the columns into records
+        student_ids = pd.Series(raw_column('studentId', ''), dtype=object).astype(str)
+        course_ids = pd.Series(raw_column('courseId', ''), dtype=object).astype(str)
+        # Align names to the ID columns with one indexed lookup each
+        student_names = pd.Series(student_lookup.reindex(student_ids).to_numpy(), dtype=object)
+        course_names = pd.Series(course_lookup.reindex(course_ids).to_numpy(), dtype=object)
+        final_scores = raw_column('finalScore', 0).tolist()
+        estimated_completion = raw_column('totalTimeSpentMinutes', 0).astype(float) / 10
+        
+        columns = {
+            'id': student_ids.tolist(),
+            'studentId': student_ids.tolist(),
+            'name': student_names.fillna('Student ' + student_ids).tolist(),  # Actual student name
+            'courseId': course_ids.tolist(),
+            'courseName': course_names.fillna('Course ' + course_ids).tolist(),  # Actual course name
+            'gradeLevel': raw_column('gradeLevel', 12).tolist(),
+            'mlRiskScore': (raw_column('risk_score', 0) * 100).tolist(),  # Convert to percentage
+            'mlRiskLevel': pd.Series(raw_column('risk_status', 'Unknown'), dtype=object).astype(str).str.lower().tolist(),
+            'isAtRisk': (raw_column('at_risk_prediction', 0) == 1).tolist(),
+            'probability': raw_column('at_risk_probability', 0).tolist(),
+            'confidence': pd.Series(raw_column('prediction_confidence', 'Unknown'), dtype=object).astype(str).tolist(),
+            'finalScore': final_scores,
+            'totalTimeSpentMinutes': raw_column('totalTimeSpentMinutes', 0).tolist(),
+            'lateSubmissionRate': raw_column('late_submission_rate', 0).tolist(),
+            'performance': final_scores,
+            'completion': np.where(estimated_completion < 100, estimated_completion, 100.0).tolist(),  # Rough estimate
+            'lastActive': [None] * len(at_risk_df),  # Not available in CSV
+            # Risk factors based on the data patterns evaluated above
+            'mlRiskFactors': [RISK_FACTOR_COMBINATIONS[code] for code in risk_factor_code_values.tolist()]
+        }
+        keys = list(columns)
         
         # Calculate summary statistics
         total_students = len(df)
-        at_risk_count = len(at_risk_students)
+        at_risk_count = len(at_risk_df)
+        
+        # Bucket the percentage risk scores in one pass; missing scores fall in no bucket
+        if 'risk_score' in at_risk_df.columns:
+            scores = at_risk_df['risk_score'].to_numpy(dtype=float) * 100
+        else:
+            scores = np.zeros(len(at_risk_df))
+        bucket_totals = np.bincount(
+            risk_bucket_codes(scores[~np.isnan(scores)], thresholds=[45, 55, 70]),
+            minlength=len(RISK_BUCKET_LABELS)
+        )
         
         summary = {
-            'total_students_analyzed': convert_to_json_serializable(total_students),
-            'at_risk_count': convert_to_json_serializable(at_risk_count),
-            'at_risk_percentage': convert_to_json_serializable((at_risk_count / total_students * 100) if total_students > 0 else 0),
+            'total_students_analyzed': total_students,
+            'at_risk_count': at_risk_count,
+            'at_risk_percentage': (at_risk_count / total_students * 100) if total_students > 0 else 0,
             'prediction_file': latest_file,
-            'high_risk_count': convert_to_json_serializable(len([s for s in at_risk_students if s['mlRiskScore'] >= 70])),
-            'medium_risk_count': convert_to_json_serializable(len([s for s in at_risk_students if 55 <= s['mlRiskScore'] < 70])),
-            'low_risk_count': convert_to_json_serializable(len([s for s in at_risk_students if 45 <= s['mlRiskScore'] < 55])),
-            'minimal_risk_count': convert_to_json_serializable(len([s for s in at_risk_students if s['mlRiskScore'] < 45]))
+            'high_risk_count': int(bucket_totals[3]),
+            'medium_risk_count': int(bucket_totals[2]),
+            'low_risk_count': int(bucket_totals[1]),
+            'minimal_risk_count': int(bucket_totals[0])
         }
         
         response = {
             'success': True,
             'summary': summary,
-            'students': at_risk_students,
             'message': f'Found {at_risk_count} at-risk students from {total_students} analyzed'
         }
         
         logger.info(f"At-risk students query completed - {at_risk_count} students found")
-        return jsonify(response)
+        if wants_ndjson():
+            # Header line with the summary, then one student per line
+            records = (dict(zip(keys, values)) for values in zip(*columns.values()))
+            return ndjson_stream_response(records, header=response)
+        
+        response['students'] = [dict(zip(keys, values)) for values in zip(*columns.values())]
+        return json_response(response)
         
     except Exception as e:
         error_msg = f"Unexpected error in get_at_risk_students: {str(e)}"
@@ -1600,53 +2205,48 @@ def get_at_risk_students():
         }), 500
 
 @app.route('/api/risk/course-data', methods=['GET'])
-def get_course_risk_data():
+@app.route('/api/risk/course-data.arrow', methods=['GET'], defaults={'as_arrow': True})
+def get_course_risk_data(as_arrow=False):
     """
     Get all course-specific risk data from the latest CSV predictions file
-    Returns raw course-risk data for student-course combinations
+    Returns raw course-risk data for student-course combinations, as JSON records or,
+    for the .arrow route / an Arrow Accept header, as a columnar Arrow IPC stream
     """
     try:
+        as_arrow = as_arrow or wants_arrow()
+        if as_arrow and pa is None:
+            return jsonify({
+                'error': 'Arrow not available',
+                'message': 'pyarrow is not installed on the server; request JSON instead'
+            }), 406
+        
         # Find the latest CSV prediction file
-        csv_files = []
-        for file in os.listdir('.'):
-            if file.startswith('risk_predictions_') and file.endswith('.csv'):
-                csv_files.append(file)
+        latest_file = find_latest_predictions_file()
         
-        if not csv_files:
+        if latest_file is None:
             return jsonify([])  # Return empty array if no files found
         
-        # Get the latest file (sorted by name which includes timestamp)
-        latest_file = sorted(csv_files, reverse=True)[0]
-        
-        # Read the CSV file
+        # Read the CSV file (cached until the file changes)
         try:
-            df = pd.read_csv(latest_file)
+            df = load_predictions_file(latest_file)
         except Exception as e:
             logger.error(f"Error reading CSV file {latest_file}: {str(e)}")
             return jsonify([])  # Return empty array on error
         
-        # Convert to list of dictionaries for frontend consumption
-        course_risk_data = []
-        for _, row in df.iterrows():
-            risk_entry = {
-                'studentId': str(row.get('studentId', '')),
-                'courseId': str(row.get('courseId', '')),
-                'risk_score': convert_to_json_serializable(row.get('risk_score', 0)),
-                'at_risk_prediction': convert_to_json_serializable(row.get('at_risk_prediction', 1)),
-                'at_risk_probability': convert_to_json_serializable(row.get('at_risk_probability', 0)),
-                'risk_status': str(row.get('risk_status', 'Unknown')),
-                'prediction_confidence': str(row.get('prediction_confidence', 'Unknown')),
-                'finalScore': convert_to_json_serializable(row.get('finalScore', 0)),
-                'late_submission_rate': convert_to_json_serializable(row.get('late_submission_rate', 0)),
-                'totalTimeSpentMinutes': convert_to_json_serializable(row.get('totalTimeSpentMinutes', 0)),
-                'declining_performance': convert_to_json_serializable(row.get('declining_performance', 0)),
-                'low_engagement': convert_to_json_serializable(row.get('low_engagement', 0)),
-                'inconsistent_performance': convert_to_json_serializable(row.get('inconsistent_performance', 0))
-            }
-            course_risk_data.append(risk_entry)
+        columns = course_risk_columns(df)
+        if as_arrow:
+            logger.info(f"Course risk data query completed - {len(df)} entries found (Arrow)")
+            return arrow_stream_response(columns)
+        
+        keys = list(columns)
+        if wants_ndjson():
+            logger.info(f"Course risk data query completed - {len(df)} entries found (NDJSON)")
+            return ndjson_stream_response(dict(zip(keys, values)) for values in zip(*columns.values()))
+        
+        course_risk_data = [dict(zip(keys, values)) for values in zip(*columns.values())]
         
         logger.info(f"Course risk data query completed - {len(course_risk_data)} entries found")
-        return jsonify(course_risk_data)
+        return json_response(course_risk_data)
         
     except Exception as e:
         error_msg = f"Unexpected error in get_course_risk_data: {str(e)}"
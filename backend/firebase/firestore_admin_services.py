@@ -1,6 +1,6 @@
 import os
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 from typing import Dict, Any, List, Optional
 import asyncio
 from datetime import datetime
@@ -11,7 +11,8 @@ if not firebase_admin._apps:
     cred = credentials.Certificate(cred_path)
     firebase_admin.initialize_app(cred)
 
-db = firestore.client()
+# Async client so the coroutines below await their RPCs instead of blocking the event loop
+db = firestore_async.client()
 
 async def add_object_to_firestore(collection_name: str, data: Dict[str, Any]) -> str:
     """
@@ -30,12 +31,92 @@ async def add_object_to_firestore(collection_name: str, data: Dict[str, Any]) ->
         
         # Add the document to Firestore
         doc_ref = db.collection(collection_name).document()
-        doc_ref.set(processed_data)
+        await doc_ref.set(processed_data)
         return doc_ref.id
     except Exception as e:
         print(f"Error adding object to {collection_name}: {e}")
         raise
 
+# Plain value types that are never converted or walked; checked by exact type() before the isinstance chain
+_SCALAR_TYPES = frozenset({str, int, float, bool, bytes, type(None)})
+
+def _contains_leaf(data: Dict[str, Any], leaf_type: type, include_list_items: bool) -> bool:
+    """
+    Check whether a nested document holds any value that _copy_document would convert
+    
+    Args:
+        data: Document data dictionary
+        leaf_type: Type of the values to look for
+        include_list_items: Whether values directly inside lists count as well
+        
+    Returns:
+        True if at least one matching value was found
+    """
+    stack = [data]
+    while stack:
+        for value in stack.pop().values():
+            if type(value) in _SCALAR_TYPES:
+                continue
+            elif isinstance(value, leaf_type):
+                return True
+            elif isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict):
+                        stack.append(item)
+                    elif include_list_items and isinstance(item, leaf_type):
+                        return True
+    return False
+
+def _copy_document(
+    data: Dict[str, Any],
+    result: Dict[str, Any],
+    leaf_type: type,
+    convert,
+    include_list_items: bool
+) -> Dict[str, Any]:
+    """
+    Copy a nested document into result, converting every leaf_type value
+    
+    Nested dicts (also inside lists) are walked with an explicit stack instead of recursion.
+    
+    Args:
+        data: Document data dictionary
+        result: Dictionary to fill with the converted copy
+        leaf_type: Type of the values to convert
+        convert: Function applied to each matching value
+        include_list_items: Whether values directly inside lists are converted as well
+        
+    Returns:
+        The filled result dictionary
+    """
+    stack = [(data, result)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            if type(value) in _SCALAR_TYPES:
+                target[key] = value
+            elif isinstance(value, leaf_type):
+                target[key] = convert(value)
+            elif isinstance(value, dict):
+                target[key] = {}
+                stack.append((value, target[key]))
+            elif isinstance(value, list):
+                items = []
+                for item in value:
+                    if isinstance(item, dict):
+                        items.append({})
+                        stack.append((item, items[-1]))
+                    elif include_list_items and isinstance(item, leaf_type):
+                        items.append(convert(item))
+                    else:
+                        items.append(item)
+                target[key] = items
+            else:
+                target[key] = value
+    return result
+
 def process_timestamp_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process any date/datetime fields to convert them to Firestore timestamps
@@ -45,21 +126,11 @@ def process_timestamp_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     
     Returns:
         Dictionary with datetime fields converted to Firestore timestamps
+        (the input itself when it holds no datetime fields)
     """
-    processed = {}
-    for key, value in data.items():
-        if isinstance(value, datetime):
-            processed[key] = firestore.Timestamp.from_datetime(value)
-        elif isinstance(value, dict):
-            processed[key] = process_timestamp_fields(value)
-        elif isinstance(value, list):
-            processed[key] = [
-                process_timestamp_fields(item) if isinstance(item, dict) else item
-                for item in value
-            ]
-        else:
-            processed[key] = value
-    return processed
+    if not _contains_leaf(data, datetime, include_list_items=False):
+        return data
+    return _copy_document(data, {}, datetime, firestore.Timestamp.from_datetime, include_list_items=False)
 
 async def get_document_by_id(collection_name: str, doc_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -74,7 +145,7 @@ async def get_document_by_id(collection_name: str, doc_id: str) -> Optional[Dict
     """
     try:
         doc_ref = db.collection(collection_name).document(doc_id)
-        doc = doc_ref.get()
+        doc = await doc_ref.get()
         if doc.exists:
             return format_document_data(doc.to_dict(), doc.id)
         return None
@@ -82,6 +153,28 @@ async def get_document_by_id(collection_name: str, doc_id: str) -> Optional[Dict
         print(f"Error getting document {doc_id} from {collection_name}: {e}")
         raise
 
+async def get_documents_by_ids(collection_name: str, doc_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Get several documents by ID in a single batched read
+    
+    Args:
+        collection_name: Name of the collection
+        doc_ids: Document IDs
+        
+    Returns:
+        Document data for each ID, in the order given (None where not found)
+    """
+    try:
+        collection = db.collection(collection_name)
+        found = {}
+        async for doc in db.get_all([collection.document(doc_id) for doc_id in doc_ids]):
+            if doc.exists:
+                found[doc.id] = format_document_data(doc.to_dict(), doc.id)
+        return [found.get(doc_id) for doc_id in doc_ids]
+    except Exception as e:
+        print(f"Error getting documents from {collection_name}: {e}")
+        raise
+
 def format_document_data(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
     """
     Format document data, converting Firestore timestamps to ISO format strings
@@ -95,24 +188,17 @@ def format_document_data(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
     """
     result = {"id": doc_id} if doc_id else {}
     
-    for key, value in data.items():
-        if isinstance(value, firestore.Timestamp):
-            # Convert Firestore timestamp to ISO format string
-            result[key] = value.todate().isoformat()
-        elif isinstance(value, dict):
-            # Process nested dictionaries
-            result[key] = format_document_data(value, "")
-        elif isinstance(value, list):
-            # Process lists
-            result[key] = [
-                format_document_data(item, "") if isinstance(item, dict) else 
-                item.todate().isoformat() if isinstance(item, firestore.Timestamp) else item
-                for item in value
-            ]
-        else:
-            result[key] = value
-            
-    return result
+    if not _contains_leaf(data, firestore.Timestamp, include_list_items=True):
+        # Nothing to convert, so nested values are shared with the input
+        result.update(data)
+        return result
+    
+    # Convert Firestore timestamps (also inside lists) to ISO format strings
+    return _copy_document(
+        data, result, firestore.Timestamp,
+        lambda timestamp: timestamp.todate().isoformat(),
+        include_list_items=True
+    )
 
 async def query_collection(
     collection_name: str, 
@@ -139,10 +225,9 @@ async def query_collection(
                     filter_dict['value']
                 )
                 
-        docs = query.stream()
         results = []
         
-        for doc in docs:
+        async for doc in query.stream():
             doc_data = doc.to_dict()
             formatted_data = format_document_data(doc_data, doc.id)
             results.append(formatted_data)
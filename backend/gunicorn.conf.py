@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for the Student Risk Prediction API.
+
+Run from the backend/ directory:
+    gunicorn -c gunicorn.conf.py api.app:app
+
+With preload_app the master process imports api.app once, which loads every
+model, its ONNX session and the compiled numba kernels at import time. Forked
+workers then share those pages copy-on-write instead of each loading their
+own copy.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('API_BIND', '0.0.0.0:5000')
+
+preload_app = True
+worker_class = 'gthread'
+workers = int(os.environ.get('API_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('API_THREADS', 2))
+
+# The CSV prediction endpoint runs the full pipeline in-request
+timeout = int(os.environ.get('API_TIMEOUT', 120))
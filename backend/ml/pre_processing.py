@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import os
 import json
+import tempfile
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -10,6 +11,29 @@ from sklearn.pipeline import Pipeline
 from sklearn.metrics import mean_squared_error, r2_score, roc_auc_score, classification_report
 from datetime import datetime
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import pyarrow
+except ImportError:
+    # Without pyarrow, CSVs are parsed by the C engine and no Parquet cache is kept
+    pyarrow = None
+
+try:
+    from numba import njit, types as nb
+    # Copy-on-write column arrays are read-only, so kernel inputs are typed read-only
+    def readonly_1d(dtype):
+        return nb.Array(dtype, 1, 'C', readonly=True)
+except ImportError:
+    # Numba is optional; the monthly aggregation falls back to NumPy/pandas
+    njit = None
+
+# Copy-on-write: derived frames share column buffers until one side is modified
+pd.set_option('mode.copy_on_write', True)
+
 # Global variables to store dataframes
 assignments_df = None
 students_assignments_df = None
@@ -18,6 +42,68 @@ courses_df = None
 students_courses_df = None
 modules_df = None
 
+# Data directory used when load_csv_data is not given one: project_root/data (backend/ml -> backend -> project_root)
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+# Date columns parsed while loading, per CSV file
+CSV_DATE_COLUMNS = {
+    'studentAssignments.csv': ['submissionDate'],
+    'courses.csv': ['startDate', 'endDate']
+}
+
+def write_parquet_atomically(df, parquet_path):
+    """
+    Write a Parquet file through a temporary file in the same directory and rename it into place,
+    so a reader in another process never sees a partially written file.
+    """
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f'.{os.path.basename(parquet_path)}.', suffix='.tmp', dir=os.path.dirname(parquet_path)
+    )
+    os.close(fd)
+    try:
+        df.to_parquet(temp_path, compression='zstd', index=False)
+        os.replace(temp_path, parquet_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def read_data_file(csv_path):
+    """
+    Read one data CSV, preferring an up-to-date Parquet copy next to it.
+    For CSVs in DEFAULT_DATA_DIR, the first read writes that copy (when pyarrow is available),
+    so later loads skip text parsing and type inference. Other directories (which API
+    clients can choose) are only read, never written to.
+    
+    Args:
+        csv_path: Path to the CSV file
+    
+    Returns:
+        DataFrame with the file contents
+    """
+    use_cache = (
+        pyarrow is not None
+        and os.path.dirname(os.path.realpath(csv_path)) == os.path.realpath(DEFAULT_DATA_DIR)
+    )
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if (use_cache and os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(parquet_path)
+    
+    df = pd.read_csv(
+        csv_path,
+        parse_dates=CSV_DATE_COLUMNS.get(os.path.basename(csv_path), False),
+        engine='pyarrow' if pyarrow is not None else 'c'
+    )
+    
+    if use_cache:
+        try:
+            write_parquet_atomically(df, parquet_path)
+        except Exception as e:
+            print(f"Warning: Could not write Parquet cache {parquet_path}: {e}")
+    
+    return df
+
 def load_csv_data(data_dir=None):
     """
     Load all CSV files into global dataframes
@@ -31,20 +117,20 @@ def load_csv_data(data_dir=None):
     global assignments_df, students_assignments_df, students_df, courses_df, students_courses_df, modules_df
     
     if data_dir is None:
-        # Default path relative to this file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Go up two levels: backend/ml -> backend -> project_root
-        project_root = os.path.dirname(os.path.dirname(current_dir))
-        data_dir = os.path.join(project_root, 'data')
+        data_dir = DEFAULT_DATA_DIR
     
     try:
         # Load all CSV files
-        assignments_df = pd.read_csv(os.path.join(data_dir, 'assignments.csv'))
-        students_assignments_df = pd.read_csv(os.path.join(data_dir, 'studentAssignments.csv'))
-        students_df = pd.read_csv(os.path.join(data_dir, 'students.csv'))
-        courses_df = pd.read_csv(os.path.join(data_dir, 'courses.csv'))
-        students_courses_df = pd.read_csv(os.path.join(data_dir, 'studentCourses.csv'))
-        modules_df = pd.read_csv(os.path.join(data_dir, 'modules.csv'))
+        assignments_df = read_data_file(os.path.join(data_dir, 'assignments.csv'))
+        students_assignments_df = read_data_file(os.path.join(data_dir, 'studentAssignments.csv'))
+        students_df = read_data_file(os.path.join(data_dir, 'students.csv'))
+        courses_df = read_data_file(os.path.join(data_dir, 'courses.csv'))
+        students_courses_df = read_data_file(os.path.join(data_dir, 'studentCourses.csv'))
+        modules_df = read_data_file(os.path.join(data_dir, 'modules.csv'))
+        
+        # Names are repeated on every assignment row after the merges; categories carry them as int codes
+        students_df['name'] = students_df['name'].astype('category')
+        courses_df['name'] = courses_df['name'].astype('category')
         
         print(f"Successfully loaded CSV data from {data_dir}")
         print(f"Assignments: {len(assignments_df)} rows")
@@ -71,6 +157,28 @@ def load_csv_data(data_dir=None):
         print(f"Unexpected error loading CSV files: {e}")
         return None
 
+def get_dataframes():
+    """
+    Return the loaded CSV dataframes, reading them from the default data directory on first use
+    
+    Nothing is read at import time; callers that need another directory call load_csv_data(data_dir) first.
+    
+    Returns:
+        dict: Dictionary containing all loaded dataframes, or None if loading failed
+    """
+    loaded = {
+        'assignments': assignments_df,
+        'student_assignments': students_assignments_df,
+        'students': students_df,
+        'courses': courses_df,
+        'student_courses': students_courses_df,
+        'modules': modules_df
+    }
+    if any(df is None for df in loaded.values()):
+        print("Loading CSV data...")
+        return load_csv_data()
+    return loaded
+
 def parse_json_columns(df, json_columns):
     """
     Parse JSON string columns into proper data structures
@@ -82,18 +190,84 @@ def parse_json_columns(df, json_columns):
     Returns:
         DataFrame with parsed JSON columns
     """
-    df_copy = df.copy()
+    # Parsed columns replace whole columns, so a shallow copy leaves the input untouched
+    df_copy = df.copy(deep=False)
     
     for col in json_columns:
         if col in df_copy.columns:
             try:
                 # Handle string representations of lists/dicts
-                df_copy[col] = df_copy[col].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
+                df_copy[col] = [json_loads(x) if isinstance(x, str) else x for x in df_copy[col].to_numpy()]
             except:
                 print(f"Warning: Could not parse JSON in column {col}")
     
     return df_copy
 
+if njit is not None:
+    @njit(nb.void(readonly_1d(nb.boolean), readonly_1d(nb.boolean), readonly_1d(nb.float64), readonly_1d(nb.float64),
+                  nb.float64[::1], nb.float64[::1], nb.int64[::1]), nogil=True)
+    def _accumulate_monthly_progress(group_starts, run_starts, scores, times, out_cumulative, out_time, out_count):
+        """Single pass over sorted assignments: running average score per group, totals per month run"""
+        run = -1
+        total_score = 0.0
+        total_assignments = 0
+        for i in range(scores.shape[0]):
+            if group_starts[i]:
+                total_score = 0.0
+                total_assignments = 0
+            if run_starts[i]:
+                run += 1
+                out_time[run] = 0.0
+                out_count[run] = 0
+            total_score += scores[i]
+            total_assignments += 1
+            out_cumulative[run] = total_score / total_assignments
+            out_time[run] += times[i]
+            out_count[run] += 1
+else:
+    _accumulate_monthly_progress = None
+
+def aggregate_monthly_progress(group_starts, run_starts, scores, times):
+    """
+    Aggregate chronologically sorted assignments into one row per student-course month.
+    
+    Args:
+        group_starts: Boolean array, True on the first assignment of each student-course combination
+        run_starts: Boolean array, True on the first assignment of each student-course month
+        scores: Assignment scores (missing scores already set to 0)
+        times: Assignment time spent (missing times already set to 0)
+    
+    Returns:
+        Tuple of (cumulative average score at the end of the month, monthly time spent,
+        monthly assignment count), one entry per month run
+    """
+    run_start_positions = np.flatnonzero(run_starts)
+    
+    if _accumulate_monthly_progress is not None:
+        n_runs = len(run_start_positions)
+        cumulative = np.empty(n_runs)
+        monthly_time = np.empty(n_runs)
+        monthly_count = np.empty(n_runs, dtype=np.int64)
+        _accumulate_monthly_progress(
+            np.ascontiguousarray(group_starts), np.ascontiguousarray(run_starts),
+            np.ascontiguousarray(scores, dtype=np.float64), np.ascontiguousarray(times, dtype=np.float64),
+            cumulative, monthly_time, monthly_count
+        )
+        if np.issubdtype(times.dtype, np.integer):
+            monthly_time = monthly_time.astype(times.dtype)
+        return cumulative, monthly_time, monthly_count
+    
+    # Running average score per student-course combination, read at the last assignment of each month
+    group_ids = np.cumsum(group_starts)
+    scores = pd.Series(scores)
+    running_average = scores.groupby(group_ids).cumsum() / (scores.groupby(group_ids).cumcount() + 1)
+    run_end_positions = np.append(run_start_positions[1:], len(scores)) - 1
+    
+    cumulative = running_average.to_numpy()[run_end_positions]
+    monthly_time = np.add.reduceat(times, run_start_positions)
+    monthly_count = np.diff(np.append(run_start_positions, len(scores)))
+    return cumulative, monthly_time, monthly_count
+
 def create_monthly_student_scores_with_time():
     """
     Create monthly student scores with time spent using the actual CSV data structure.
@@ -103,14 +277,8 @@ def create_monthly_student_scores_with_time():
     Returns:
         DataFrame with student progress data organized by month
     """
-    global assignments_df, students_assignments_df, students_df, courses_df, students_courses_df
-    
     # Load data if not already loaded
-    if any(df is None for df in [assignments_df, students_assignments_df, students_df, courses_df, students_courses_df]):
-        print("Loading CSV data...")
-        load_csv_data()
-    
-    if any(df is None for df in [assignments_df, students_assignments_df, students_df, courses_df, students_courses_df]):
+    if get_dataframes() is None:
         raise ValueError("Failed to load required CSV data")
     
     # Step 1: Prepare student assignments data
@@ -122,38 +290,29 @@ def create_monthly_student_scores_with_time():
     # Filter out rows without submission dates (these are incomplete/future assignments)
     student_assignments = student_assignments.dropna(subset=['submissionDate'])
     
-    # Create month_year for grouping
-    student_assignments['month_year'] = student_assignments['submissionDate'].dt.strftime('%Y-%m')
-      # Step 2: Add student information
-    student_info = students_df[['id', 'name', 'gradeLevel']].rename(columns={'id': 'studentId', 'name': 'student_name'})
-    student_assignments = pd.merge(
-        student_assignments,
-        student_info,
-        on='studentId',
-        how='left'
+    # Create month_year for grouping: the first day of the submission month, truncated in datetime64
+    student_assignments['month_year'] = (
+        student_assignments['submissionDate'].to_numpy().astype('datetime64[M]').astype('datetime64[s]')
     )
+      # Step 2: Add student information
+    # Left joins against id-indexed lookups, keeping assignment row order
+    student_info = students_df[['id', 'name', 'gradeLevel']].rename(columns={'name': 'student_name'}).set_index('id')
+    student_assignments = student_assignments.join(student_info, on='studentId')
     
     # Step 3: Add course information
     course_info = courses_df[['id', 'name', 'startDate', 'endDate']].rename(
-        columns={'id': 'courseId', 'name': 'course_name'}
-    )
+        columns={'name': 'course_name'}
+    ).set_index('id')
     course_info['startDate'] = pd.to_datetime(course_info['startDate'])
     course_info['endDate'] = pd.to_datetime(course_info['endDate'])
     
-    student_assignments = pd.merge(
-        student_assignments,
-        course_info,
-        on='courseId',
-        how='left'
-    )
+    student_assignments = student_assignments.join(course_info, on='courseId')
     
     # Step 4: Filter assignments within course period
-    student_assignments['month_year_date'] = pd.to_datetime(student_assignments['month_year'] + '-01')
-    
-    # Keep only submissions within course duration
+    # Keep only submissions whose month starts within course duration
     active_assignments = student_assignments[
-        (student_assignments['month_year_date'] >= student_assignments['startDate']) &
-        (student_assignments['month_year_date'] <= student_assignments['endDate'])
+        (student_assignments['month_year'] >= student_assignments['startDate']) &
+        (student_assignments['month_year'] <= student_assignments['endDate'])
     ].copy()
     
     # Step 5: Sort chronologically for cumulative calculations
@@ -161,135 +320,107 @@ def create_monthly_student_scores_with_time():
         by=['studentId', 'courseId', 'submissionDate']
     )
       # Step 6: Calculate cumulative metrics and late submission rates
-    cumulative_data = []
-    
-    # Process each student-course combination
-    for (student_id, course_id), group in active_assignments.groupby(['studentId', 'courseId']):
-        # Get metadata from first row
-        student_name = group['student_name'].iloc[0]
-        course_name = group['course_name'].iloc[0]
-        grade_level = group['gradeLevel'].iloc[0] if 'gradeLevel' in group.columns else 12
-        
-        # Calculate late submission rate for this student-course combination
-        total_submissions = len(group)
-        late_submissions = group['isLate'].sum() if 'isLate' in group.columns else 0
-        late_submission_rate = late_submissions / total_submissions if total_submissions > 0 else 0
-        
-        # Initialize running totals
-        total_score = 0
-        total_time = 0
-        total_assignments = 0
-        
-        # Track monthly aggregations
-        monthly_stats = {}
-        
-        # Process each assignment chronologically
-        for _, row in group.iterrows():
-            month_year = row['month_year']
-            score = row['assessmentScore'] if not pd.isna(row['assessmentScore']) else 0
-            time_spent = row['timeSpentMinutes'] if not pd.isna(row['timeSpentMinutes']) else 0
-            
-            # Update running totals
-            total_score += score
-            total_time += time_spent
-            total_assignments += 1
-            
-            # Calculate cumulative average score
-            cumulative_avg_score = total_score / total_assignments
-            
-            # Initialize monthly stats if not exists
-            if month_year not in monthly_stats:
-                monthly_stats[month_year] = {
-                    'cumulative_score': 0,
-                    'monthly_time': 0,
-                    'monthly_assignments': 0
-                }
-            
-            # Update monthly stats (keep latest cumulative score for the month)
-            monthly_stats[month_year]['cumulative_score'] = cumulative_avg_score
-            monthly_stats[month_year]['monthly_time'] += time_spent
-            monthly_stats[month_year]['monthly_assignments'] += 1
-        
-        # Create records for each month
-        for month, stats in monthly_stats.items():
-            cumulative_data.append({
-                'studentId': student_id,
-                'student_name': student_name,
-                'courseId': course_id,
-                'course_name': course_name,
-                'gradeLevel': grade_level,
-                'late_submission_rate': late_submission_rate,
-                'month_year': month,
-                'cumulative_score': stats['cumulative_score'],
-                'monthly_time_spent': stats['monthly_time'],
-                'monthly_assignments': stats['monthly_assignments']
-            })
-    
-    # Convert to DataFrame
-    if not cumulative_data:
+    group_keys = ['studentId', 'courseId']
+    
+    # Rows without a complete student-course key belong to no group
+    active_assignments = active_assignments.dropna(subset=group_keys)
+    
+    if active_assignments.empty:
         print("Warning: No valid assignment data found for processing")
         return pd.DataFrame()
     
-    cumulative_df = pd.DataFrame(cumulative_data)
-      # Step 7: Create pivot tables
-    # Pivot for cumulative scores
-    pivot_scores = cumulative_df.pivot_table(
-        index=['studentId', 'student_name', 'courseId', 'course_name', 'gradeLevel', 'late_submission_rate'],
-        columns='month_year',
-        values='cumulative_score',
-        fill_value=0
-    )
+    # Missing scores and times count as 0
+    scores = active_assignments['assessmentScore'].fillna(0).to_numpy()
+    times = active_assignments['timeSpentMinutes'].fillna(0).to_numpy()
     
-    # Pivot for monthly time spent
-    pivot_time = cumulative_df.pivot_table(
-        index=['studentId', 'student_name', 'courseId', 'course_name', 'gradeLevel', 'late_submission_rate'],
-        columns='month_year',
-        values='monthly_time_spent',
-        fill_value=0
-    )
+    # Rows are sorted by student, course and date, so every student-course combination and
+    # every month within it is a contiguous run of rows
+    student_ids = active_assignments['studentId'].to_numpy()
+    course_ids = active_assignments['courseId'].to_numpy()
+    months = active_assignments['month_year'].to_numpy()
+    
+    group_starts = np.ones(len(active_assignments), dtype=bool)
+    group_starts[1:] = (student_ids[1:] != student_ids[:-1]) | (course_ids[1:] != course_ids[:-1])
+    run_starts = group_starts.copy()
+    run_starts[1:] |= months[1:] != months[:-1]
     
-    # Step 8: Rename columns to sequential format
-    # Sort columns chronologically
-    score_cols = sorted(pivot_scores.columns)
-    time_cols = sorted(pivot_time.columns)
-    
-    # Create sequential naming
-    score_mapping = {score_cols[i]: f'Score_Month_{i+1}' for i in range(len(score_cols))}
-    time_mapping = {time_cols[i]: f'TimeSpent_Month_{i+1}' for i in range(len(time_cols))}
-    
-    pivot_scores = pivot_scores.rename(columns=score_mapping)
-    pivot_time = pivot_time.rename(columns=time_mapping)
-      # Step 9: Merge pivots
-    result_df = pd.merge(
-        pivot_scores.reset_index(),
-        pivot_time.reset_index(),
-        on=['studentId', 'student_name', 'courseId', 'course_name', 'gradeLevel', 'late_submission_rate'],
-        how='outer'
+    # Monthly aggregations (keep latest cumulative score for the month)
+    cumulative_scores, monthly_time, monthly_assignments = aggregate_monthly_progress(
+        group_starts, run_starts, scores, times
     )
     
-    # Step 10: Add final scores from student_courses
-    final_scores = students_courses_df[['studentId', 'courseId', 'finalScore', 'totalTimeSpentMinutes']].copy()
-    final_scores['finalScore'] = final_scores['finalScore'].fillna(0)
-    final_scores['totalTimeSpentMinutes'] = final_scores['totalTimeSpentMinutes'].fillna(0)
+    # Student-course metadata from the first assignment of each combination
+    group_start_positions = np.flatnonzero(group_starts)
+    group_sizes = np.diff(np.append(group_start_positions, len(active_assignments)))
+    run_groups = np.cumsum(group_starts)[run_starts] - 1
+    first_rows = active_assignments.iloc[group_start_positions]
     
-    result_df = pd.merge(
-        result_df,
-        final_scores,
-        on=['studentId', 'courseId'],
-        how='left'
-    )
+    if 'gradeLevel' in active_assignments.columns:
+        grade_levels = first_rows['gradeLevel'].to_numpy()[run_groups]
+    else:
+        grade_levels = 12
+    
+    # Late submission rate for each student-course combination
+    if 'isLate' in active_assignments.columns:
+        late_flags = active_assignments['isLate'].astype(float).fillna(0).to_numpy()
+        late_submission_rates = (np.add.reduceat(late_flags, group_start_positions) / group_sizes)[run_groups]
+    else:
+        late_submission_rates = 0
+    
+    cumulative_df = pd.DataFrame({
+        'studentId': student_ids[run_starts],
+        'student_name': first_rows['student_name'].to_numpy()[run_groups],
+        'courseId': course_ids[run_starts],
+        'course_name': first_rows['course_name'].to_numpy()[run_groups],
+        'gradeLevel': grade_levels,
+        'late_submission_rate': late_submission_rates,
+        'month_year': months[run_starts],
+        'cumulative_score': cumulative_scores,
+        'monthly_time_spent': monthly_time,
+        'monthly_assignments': monthly_assignments
+    })
+      # Step 7: Spread the monthly values into one row per student-course combination
+    info_index_cols = ['studentId', 'student_name', 'courseId', 'course_name', 'gradeLevel', 'late_submission_rate']
+    
+    # Combinations with missing metadata have no row, as when pivoting on these columns
+    cumulative_df = cumulative_df.dropna(subset=info_index_cols)
+    
+    group_codes, group_uniques = pd.factorize(pd.MultiIndex.from_frame(cumulative_df[info_index_cols]))
+    # Month columns in chronological order
+    month_codes, month_uniques = pd.factorize(cumulative_df['month_year'], sort=True)
+    
+    # Scatter both measures into dense (combination x month) matrices; months without activity stay 0
+    score_matrix = np.zeros((len(group_uniques), len(month_uniques)))
+    time_matrix = np.zeros((len(group_uniques), len(month_uniques)))
+    score_matrix[group_codes, month_codes] = cumulative_df['cumulative_score'].to_numpy()
+    time_matrix[group_codes, month_codes] = cumulative_df['monthly_time_spent'].to_numpy()
+    
+    # Step 8: Name month columns sequentially and order rows by the combination columns
+    info_df = group_uniques.to_frame(index=False, name=info_index_cols)
+    row_order = info_df.sort_values(info_index_cols).index.to_numpy()
+    
+    # Step 9: Assemble info, score and time columns
+    result_df = pd.concat([
+        info_df.iloc[row_order].reset_index(drop=True),
+        pd.DataFrame(score_matrix[row_order], columns=[f'Score_Month_{i+1}' for i in range(len(month_uniques))]),
+        pd.DataFrame(time_matrix[row_order], columns=[f'TimeSpent_Month_{i+1}' for i in range(len(month_uniques))])
+    ], axis=1)
+    
+    # Step 10: Add final scores from student_courses (indexed lookup on the student-course key)
+    final_scores = students_courses_df.drop_duplicates(subset=['studentId', 'courseId']).set_index(
+        ['studentId', 'courseId']
+    )[['finalScore', 'totalTimeSpentMinutes']].fillna(0)
+    
+    student_course_keys = pd.MultiIndex.from_frame(result_df[['studentId', 'courseId']])
+    matched_scores = final_scores.reindex(student_course_keys)
+    result_df['finalScore'] = matched_scores['finalScore'].to_numpy()
+    result_df['totalTimeSpentMinutes'] = matched_scores['totalTimeSpentMinutes'].to_numpy()
     
     # Step 11: Add course metadata
-    course_metadata = courses_df[['id', 'startDate', 'endDate']].rename(columns={'id': 'courseId'})
-    course_metadata['startDate'] = pd.to_datetime(course_metadata['startDate']).dt.strftime('%Y-%m-%d')
-    course_metadata['endDate'] = pd.to_datetime(course_metadata['endDate']).dt.strftime('%Y-%m-%d')
-    
-    result_df = pd.merge(
-        result_df,
-        course_metadata,
-        on='courseId',
-        how='left'
-    )
+    course_metadata = courses_df.drop_duplicates(subset='id').set_index('id')
+    for date_col in ['startDate', 'endDate']:
+        course_dates = pd.to_datetime(course_metadata[date_col]).dt.strftime('%Y-%m-%d')
+        result_df[date_col] = result_df['courseId'].map(course_dates)
       # Step 12: Organize columns
     info_cols = ['studentId', 'student_name', 'courseId', 'course_name', 'gradeLevel', 'late_submission_rate', 'startDate', 'endDate']
     score_month_cols = [col for col in result_df.columns if col.startswith('Score_Month_')]
@@ -303,6 +434,34 @@ def create_monthly_student_scores_with_time():
     
     return result_df
 
+def partition_quantile(values, q):
+    """
+    Linear-interpolated quantile of the non-NaN values, as Series.quantile computes it
+    
+    Selects the two neighbouring order statistics with np.partition instead of sorting.
+    
+    Args:
+        values: 1-D float array
+        q: Quantile between 0 and 1
+    
+    Returns:
+        float: The quantile, or NaN if there are no values
+    """
+    values = values[~np.isnan(values)]
+    n = values.shape[0]
+    if n == 0:
+        return np.nan
+    position = (n - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, n - 1)
+    partitioned = np.partition(values, [lower, upper])
+    low, high = partitioned[lower], partitioned[upper]
+    # Interpolate from the nearer end, as NumPy does, so results match bit for bit
+    fraction = position - lower
+    if fraction >= 0.5:
+        return high - (high - low) * (1 - fraction)
+    return low + (high - low) * fraction
+
 def prepare_student_data_for_ml(df):
     """
     Prepare the student data for machine learning by engineering features
@@ -314,18 +473,17 @@ def prepare_student_data_for_ml(df):
     Returns:
         Processed DataFrame ready for machine learning
     """
-    # Make a copy to avoid modifying the original
-    data = df.copy()
-    
     # Handle empty dataframe
-    if data.empty:
+    if df.empty:
         print("Warning: Empty dataframe provided to prepare_student_data_for_ml")
-        return data
+        return df.copy()
+    
+    data = df
+    # Engineered columns are collected here and attached in one concat instead of one insert each
+    new_cols = {}
 
     # 1. Convert dates to usable features (course duration in days)
-    data['startDate'] = pd.to_datetime(data['startDate'])
-    data['endDate'] = pd.to_datetime(data['endDate'])
-    data['course_duration_days'] = (data['endDate'] - data['startDate']).dt.days
+    new_cols['course_duration_days'] = (pd.to_datetime(data['endDate']) - pd.to_datetime(data['startDate'])).dt.days
 
     # 2. Engineer features that capture progression patterns
     # Get score and time columns
@@ -336,96 +494,107 @@ def prepare_student_data_for_ml(df):
     score_cols = sorted(score_cols, key=lambda x: int(x.split('_')[-1]))
     time_cols = sorted(time_cols, key=lambda x: int(x.split('_')[-1]))
 
+    # Month values as (rows x months) matrices; every row statistic below is one NumPy reduction
+    score_matrix = data[score_cols].to_numpy()
+    time_matrix = data[time_cols].to_numpy()
+    
+    def row_reduce(reduction, matrix):
+        # Without month columns the statistic is missing, as with the pandas row reductions
+        if matrix.shape[1] == 0:
+            return np.full(matrix.shape[0], np.nan)
+        return reduction(matrix, axis=1)
+
     # Calculate score progression (differences between consecutive months)
+    score_changes = np.diff(score_matrix, axis=1)
     for i in range(1, len(score_cols)):
-        curr_col = score_cols[i]
-        prev_col = score_cols[i-1]
-        data[f'score_change_month_{i+1}'] = data[curr_col] - data[prev_col]
+        new_cols[f'score_change_month_{i+1}'] = score_changes[:, i-1]
 
     # Calculate time spent progression
+    time_changes = np.diff(time_matrix, axis=1)
     for i in range(1, len(time_cols)):
-        curr_col = time_cols[i]
-        prev_col = time_cols[i-1]
-        data[f'time_change_month_{i+1}'] = data[curr_col] - data[prev_col]
+        new_cols[f'time_change_month_{i+1}'] = time_changes[:, i-1]
 
     # 3. Calculate variance in scores and time spent (consistency metrics)
     if len(score_cols) > 1:
-        data['score_variance'] = data[score_cols].var(axis=1, skipna=True)
-        data['score_std'] = data[score_cols].std(axis=1, skipna=True)
+        new_cols['score_variance'] = np.nanvar(score_matrix, axis=1, ddof=1)
+        new_cols['score_std'] = np.sqrt(new_cols['score_variance'])
     else:
-        data['score_variance'] = 0
-        data['score_std'] = 0
+        new_cols['score_variance'] = 0
+        new_cols['score_std'] = 0
         
     if len(time_cols) > 1:
-        data['time_variance'] = data[time_cols].var(axis=1, skipna=True)
-        data['time_std'] = data[time_cols].std(axis=1, skipna=True)
+        new_cols['time_variance'] = np.nanvar(time_matrix, axis=1, ddof=1)
+        new_cols['time_std'] = np.sqrt(new_cols['time_variance'])
     else:
-        data['time_variance'] = 0
-        data['time_std'] = 0
+        new_cols['time_variance'] = 0
+        new_cols['time_std'] = 0
 
     # 4. Calculate engagement metrics
-    data['avg_monthly_score'] = data[score_cols].mean(axis=1, skipna=True)
-    data['avg_monthly_time'] = data[time_cols].mean(axis=1, skipna=True)
-    data['total_active_months'] = (data[score_cols] > 0).sum(axis=1)
-    data['max_monthly_score'] = data[score_cols].max(axis=1, skipna=True)
-    data['min_monthly_score'] = data[score_cols].min(axis=1, skipna=True)
+    new_cols['avg_monthly_score'] = row_reduce(np.nanmean, score_matrix)
+    new_cols['avg_monthly_time'] = row_reduce(np.nanmean, time_matrix)
+    new_cols['total_active_months'] = (score_matrix > 0).sum(axis=1)
+    new_cols['max_monthly_score'] = row_reduce(np.nanmax, score_matrix)
+    new_cols['min_monthly_score'] = row_reduce(np.nanmin, score_matrix)
 
     # 5. Calculate efficiency metric (score per time spent)
     # Avoid division by zero
     total_time_safe = data['totalTimeSpentMinutes'].replace(0, 1)
-    data['score_per_minute'] = data['finalScore'] / total_time_safe
+    new_cols['score_per_minute'] = data['finalScore'] / total_time_safe
     
     # Monthly efficiency (average monthly score per average monthly time)
-    avg_time_safe = data['avg_monthly_time'].replace(0, 1)
-    data['monthly_score_per_minute'] = data['avg_monthly_score'] / avg_time_safe
+    avg_time_safe = np.where(new_cols['avg_monthly_time'] == 0, 1, new_cols['avg_monthly_time'])
+    new_cols['monthly_score_per_minute'] = new_cols['avg_monthly_score'] / avg_time_safe
 
     # 6. Create engagement pattern features
     # Early vs late engagement (first third vs last third of months)
     num_months = len(score_cols)
     if num_months >= 3:
-        early_months = score_cols[:num_months//3] if num_months//3 > 0 else score_cols[:1]
-        late_months = score_cols[-num_months//3:] if num_months//3 > 0 else score_cols[-1:]
-        
-        data['early_avg_score'] = data[early_months].mean(axis=1, skipna=True)
-        data['late_avg_score'] = data[late_months].mean(axis=1, skipna=True)
-        data['score_improvement'] = data['late_avg_score'] - data['early_avg_score']
+        # Column slices of the month matrices: first third, and last third rounded up
+        early_months = slice(None, num_months//3)
+        late_months = slice(-num_months//3, None)
         
-        early_time_months = time_cols[:num_months//3] if num_months//3 > 0 else time_cols[:1]
-        late_time_months = time_cols[-num_months//3:] if num_months//3 > 0 else time_cols[-1:]
+        new_cols['early_avg_score'] = np.nanmean(score_matrix[:, early_months], axis=1)
+        new_cols['late_avg_score'] = np.nanmean(score_matrix[:, late_months], axis=1)
+        new_cols['score_improvement'] = new_cols['late_avg_score'] - new_cols['early_avg_score']
         
-        data['early_avg_time'] = data[early_time_months].mean(axis=1, skipna=True)
-        data['late_avg_time'] = data[late_time_months].mean(axis=1, skipna=True)
-        data['time_trend'] = data['late_avg_time'] - data['early_avg_time']
+        new_cols['early_avg_time'] = np.nanmean(time_matrix[:, early_months], axis=1)
+        new_cols['late_avg_time'] = np.nanmean(time_matrix[:, late_months], axis=1)
+        new_cols['time_trend'] = new_cols['late_avg_time'] - new_cols['early_avg_time']
     else:
-        data['early_avg_score'] = data[score_cols].mean(axis=1, skipna=True) if score_cols else 0
-        data['late_avg_score'] = data[score_cols].mean(axis=1, skipna=True) if score_cols else 0
-        data['score_improvement'] = 0
-        data['early_avg_time'] = data[time_cols].mean(axis=1, skipna=True) if time_cols else 0
-        data['late_avg_time'] = data[time_cols].mean(axis=1, skipna=True) if time_cols else 0
-        data['time_trend'] = 0
+        new_cols['early_avg_score'] = new_cols['avg_monthly_score'] if score_cols else 0
+        new_cols['late_avg_score'] = new_cols['avg_monthly_score'] if score_cols else 0
+        new_cols['score_improvement'] = 0
+        new_cols['early_avg_time'] = new_cols['avg_monthly_time'] if time_cols else 0
+        new_cols['late_avg_time'] = new_cols['avg_monthly_time'] if time_cols else 0
+        new_cols['time_trend'] = 0
 
     # 7. Risk indicators
+    # Plain arrays from here on: NaN-skipping reductions stand in for the pandas ones
+    avg_score = new_cols['avg_monthly_score']
+    avg_time = new_cols['avg_monthly_time']
+    score_std = np.zeros(len(data)) + new_cols['score_std']
+
     # Students with declining scores
-    data['declining_performance'] = (data['score_improvement'] < -5).astype(int)
+    new_cols['declining_performance'] = (np.asarray(new_cols['score_improvement']) < -5).astype(int)
     
     # Students with very low engagement
-    data['low_engagement'] = (data['avg_monthly_time'] < data['avg_monthly_time'].quantile(0.25)).astype(int)
+    new_cols['low_engagement'] = (avg_time < partition_quantile(avg_time, 0.25)).astype(int)
     
     # Students with inconsistent performance
-    data['inconsistent_performance'] = (data['score_std'] > data['score_std'].quantile(0.75)).astype(int)
+    new_cols['inconsistent_performance'] = (score_std > partition_quantile(score_std, 0.75)).astype(int)
 
     # 8. Create risk score (composite metric)
-    # Normalize components to 0-1 scale
-    score_component = 1 - (data['avg_monthly_score'] / 100)  # Lower scores = higher risk
-    time_component = 1 - (data['avg_monthly_time'] / data['avg_monthly_time'].max())  # Lower time = higher risk
-    consistency_component = data['score_std'] / 100  # Higher variance = higher risk
-    
-    # Combined risk score (0-1, higher = more at risk)
-    data['risk_score'] = (score_component * 0.5 + time_component * 0.3 + consistency_component * 0.2)
+    # Lower scores, lower time and higher variance all mean higher risk, each normalized to 0-1
+    max_time = np.nanmax(avg_time) if len(avg_time) else np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_score = 0.5 * (1 - avg_score / 100) + 0.3 * (1 - avg_time / max_time) + 0.2 * (score_std / 100)
+    new_cols['risk_score'] = risk_score
     
     # Binary risk classification (at risk if in top 30% of risk scores)
-    risk_threshold = data['risk_score'].quantile(0.7)
-    data['at_risk'] = (data['risk_score'] >= risk_threshold).astype(int)
+    new_cols['at_risk'] = (risk_score >= partition_quantile(risk_score, 0.7)).astype(int)
+    
+    # Attach every engineered column at once (this also leaves the input frame untouched)
+    data = pd.concat([data, pd.DataFrame(new_cols, index=data.index)], axis=1)
 
     # 9. Fill missing values
     # Fill numeric columns with 0
@@ -435,7 +604,7 @@ def prepare_student_data_for_ml(df):
     # 10. Drop non-ML columns
     columns_to_drop = ['startDate', 'endDate', 'student_name', 'course_name']
     columns_to_drop = [col for col in columns_to_drop if col in data.columns]
-    data.drop(columns_to_drop, axis=1, inplace=True)
+    data = data.drop(columns=columns_to_drop)
 
     return data
 
@@ -480,16 +649,6 @@ def create_risk_prediction_dataset():
     
     return features_df, target_series, feature_cols
 
-# Initialize the data loading when the module is imported
-print("Initializing preprocessing module...")
-try:
-    # Load data automatically
-    load_csv_data()
-    print("CSV data loaded successfully!")
-except Exception as e:
-    print(f"Warning: Could not auto-load CSV data: {e}")
-    print("You can manually load data using load_csv_data(data_dir='path/to/csv')")
-
 # Create the main dataset when this script is run directly
 if __name__ == "__main__":
     print("\n" + "="*50)
@@ -533,13 +692,16 @@ if __name__ == "__main__":
             print(f"Target distribution:")
             print(target_series.value_counts())
             
-            # Optional: Save to CSV
+            # Optional: Save to Parquet (CSV when pyarrow is not installed)
             try:
                 output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
                 os.makedirs(output_dir, exist_ok=True)
                 
-                monthly_stats_df.to_csv(os.path.join(output_dir, 'monthly_student_scores.csv'), index=False)
-                features_df.to_csv(os.path.join(output_dir, 'ml_features.csv'), index=False)
+                for name, df in [('monthly_student_scores', monthly_stats_df), ('ml_features', features_df)]:
+                    if pyarrow is not None:
+                        df.to_parquet(os.path.join(output_dir, f'{name}.parquet'), compression='zstd', index=False)
+                    else:
+                        df.to_csv(os.path.join(output_dir, f'{name}.csv'), index=False)
                 
                 print(f"\nDatasets saved to {output_dir}")
             except Exception as e:
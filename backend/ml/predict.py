@@ -1,3 +1,8 @@
+"""
+Predict at-risk students with the trained risk model
+Feature code here uses vectorized operations over iteration: work on whole columns
+or matrices with pandas/NumPy (or Numba kernels), never row by row with iterrows or apply.
+"""
 import pandas as pd
 import numpy as np
 import joblib
@@ -5,7 +10,13 @@ import os
 import sys
 from datetime import datetime
 import warnings
-from scipy import stats
+from functools import lru_cache
+
+try:
+    from numba import njit, types as nb
+except ImportError:
+    # Numba is optional; early warning features fall back to NumPy
+    njit = None
 
 # Add the backend directory to Python path
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -31,6 +42,133 @@ except ImportError:
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
+# Levels of the risk_status column
+RISK_STATUS_LABELS = ['At Risk', 'Not At Risk']
+
+# Confidence levels of the predicted class, and the probability at which each level above 'Low' starts
+CONFIDENCE_LABELS = np.array(['Low', 'Medium', 'High', 'Very High'], dtype=object)
+CONFIDENCE_THRESHOLDS = np.array([0.60, 0.75, 0.90])
+
+# Early warning features computed from the early month matrices, in output order
+EARLY_MATRIX_FEATURES = [
+    'early_avg_score', 'early_avg_time', 'early_score_variance', 'early_time_variance',
+    'early_engagement', 'weighted_early_score', 'early_trend'
+]
+
+if njit is not None:
+    # Compiled eagerly at import for the one signature used; inputs may be read-only copy-on-write views
+    @njit(nb.void(nb.Array(nb.float64, 2, 'C', readonly=True), nb.Array(nb.float64, 2, 'C', readonly=True),
+                  nb.Array(nb.float64, 1, 'C', readonly=True), nb.float64[:, ::1]), nogil=True)
+    def _early_matrix_kernel(scores, times, months, out):
+        """One pass per row computing every EARLY_MATRIX_FEATURES value, in the NumPy reductions' order"""
+        n_scores = scores.shape[1]
+        n_times = times.shape[1]
+        weight_total = n_scores * (n_scores + 1) // 2
+        for i in range(scores.shape[0]):
+            # Scores: mean and weighted sum over present months, trend sums over positive months
+            total = 0.0
+            weighted = 0.0
+            count = 0
+            x_total = 0.0
+            y_total = 0.0
+            n_valid = 0
+            for j in range(n_scores):
+                value = scores[i, j]
+                if value == value:
+                    total += value
+                    weighted += value * (j + 1)
+                    count += 1
+                    if value > 0:
+                        x_total += months[j]
+                        y_total += value
+                        n_valid += 1
+            mean = total / count if count > 0 else np.nan
+            squares = 0.0
+            x_mean = x_total / n_valid if n_valid > 0 else 0.0
+            y_mean = y_total / n_valid if n_valid > 0 else 0.0
+            covariance = 0.0
+            x_squares = 0.0
+            for j in range(n_scores):
+                value = scores[i, j]
+                if value == value:
+                    squares += (value - mean) * (value - mean)
+                    if value > 0:
+                        x_dev = months[j] - x_mean
+                        covariance += x_dev * (value - y_mean)
+                        x_squares += x_dev * x_dev
+            out[0, i] = mean
+            out[2, i] = squares / (count - 1) if count > 1 else np.nan
+            out[5, i] = weighted / weight_total
+            out[6, i] = covariance / x_squares if n_valid >= 2 else 0.0
+
+            # Time spent: mean, variance and share of active months
+            total = 0.0
+            count = 0
+            active = 0
+            for j in range(n_times):
+                value = times[i, j]
+                if value == value:
+                    total += value
+                    count += 1
+                    if value > 0:
+                        active += 1
+            mean = total / count if count > 0 else np.nan
+            squares = 0.0
+            for j in range(n_times):
+                value = times[i, j]
+                if value == value:
+                    squares += (value - mean) * (value - mean)
+            out[1, i] = mean
+            out[3, i] = squares / (count - 1) if count > 1 else np.nan
+            out[4, i] = active / n_times
+else:
+    _early_matrix_kernel = None
+
+def early_matrix_features(early_scores, early_times, month_numbers):
+    """
+    Compute the early warning features that reduce the early month matrices.
+    
+    Args:
+        early_scores: (students x months) float64 score matrix, NaN for missing months
+        early_times: (students x months) float64 time spent matrix, NaN for missing months
+        month_numbers: float64 month number of each score column
+        
+    Returns:
+        dict mapping each EARLY_MATRIX_FEATURES name to a float64 array
+    """
+    if _early_matrix_kernel is not None and early_scores.shape[1] and early_times.shape[1]:
+        out = np.empty((len(EARLY_MATRIX_FEATURES), early_scores.shape[0]))
+        _early_matrix_kernel(
+            np.ascontiguousarray(early_scores), np.ascontiguousarray(early_times),
+            np.ascontiguousarray(month_numbers), out
+        )
+        return dict(zip(EARLY_MATRIX_FEATURES, out))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features = {
+            'early_avg_score': np.nanmean(early_scores, axis=1),
+            'early_avg_time': np.nanmean(early_times, axis=1),
+            'early_score_variance': np.nanvar(early_scores, axis=1, ddof=1),
+            'early_time_variance': np.nanvar(early_times, axis=1, ddof=1),
+            'early_engagement': (early_times > 0).mean(axis=1)
+        }
+        
+        # More recent months weighted higher
+        weights = np.arange(1, early_scores.shape[1] + 1)
+        features['weighted_early_score'] = np.nansum(early_scores * weights, axis=1) / weights.sum()
+        
+        # Least-squares slope per row over the months with a positive score, as linregress computes it
+        valid = ~np.isnan(early_scores) & (early_scores > 0)
+        n_valid = valid.sum(axis=1)
+        x_mean = (month_numbers * valid).sum(axis=1) / n_valid
+        y_mean = np.where(valid, early_scores, 0).sum(axis=1) / n_valid
+        x_dev = np.where(valid, month_numbers - x_mean[:, None], 0)
+        y_dev = np.where(valid, early_scores - y_mean[:, None], 0)
+        slopes = (x_dev * y_dev).sum(axis=1) / (x_dev * x_dev).sum(axis=1)
+        # Rows with fewer than 2 scored months have no trend
+        features['early_trend'] = np.where(n_valid >= 2, slopes, 0)
+    return features
+
 def create_early_warning_features(df):
     """
     Create early warning features using only the first 3 months of data.
@@ -62,29 +200,20 @@ def create_early_warning_features(df):
     if not early_time_columns:
         early_time_columns = time_columns[:3] if time_columns else []
     
-    # Early average score (first 3 months)
-    if early_score_columns:
-        df['early_avg_score'] = df[early_score_columns].mean(axis=1, skipna=True)
-    else:
-        df['early_avg_score'] = 0
+    # Early month matrices, shared by every feature below
+    early_scores = df[early_score_columns].to_numpy(dtype=np.float64)
+    early_times = df[early_time_columns].to_numpy(dtype=np.float64)
     
-    # Early average time spent (first 3 months)
-    if early_time_columns:
-        df['early_avg_time'] = df[early_time_columns].mean(axis=1, skipna=True)
-    else:
-        df['early_avg_time'] = 0
+    month_numbers = np.array([int(c.split('_')[-1]) for c in early_score_columns], dtype=np.float64)
+    features = early_matrix_features(early_scores, early_times, month_numbers)
     
-    # Score variance for early months (consistency indicator)
-    if len(early_score_columns) > 1:
-        df['early_score_variance'] = df[early_score_columns].var(axis=1, skipna=True)
-    else:
-        df['early_score_variance'] = 0
+    # Early average score and time spent (first 3 months), skipping missing months
+    df['early_avg_score'] = features['early_avg_score'] if early_score_columns else 0
+    df['early_avg_time'] = features['early_avg_time'] if early_time_columns else 0
     
-    # Time variance for early months
-    if len(early_time_columns) > 1:
-        df['early_time_variance'] = df[early_time_columns].var(axis=1, skipna=True)
-    else:
-        df['early_time_variance'] = 0
+    # Score and time variance for early months (consistency indicators)
+    df['early_score_variance'] = features['early_score_variance'] if len(early_score_columns) > 1 else 0
+    df['early_time_variance'] = features['early_time_variance'] if len(early_time_columns) > 1 else 0
     
     # Time-to-score efficiency ratio (early months)
     # Previous implementation divided by early_avg_score with .replace(0,1) which inflates ratio when score is 0.
@@ -96,44 +225,14 @@ def create_early_warning_features(df):
     )
     
     # Early engagement rate (proportion of months with activity)
-    if early_time_columns:
-        df['early_engagement'] = df[early_time_columns].apply(
-            lambda x: (x > 0).sum() / len(early_time_columns), axis=1
-        )
-    else:
-        df['early_engagement'] = 0
+    df['early_engagement'] = features['early_engagement'] if early_time_columns else 0
     
     # Weighted early score (more recent months weighted higher)
-    if early_score_columns:
-        weights = np.array(range(1, len(early_score_columns) + 1))
-        weighted_scores = df[early_score_columns].multiply(weights, axis=1)
-        df['weighted_early_score'] = weighted_scores.sum(axis=1) / weights.sum()
-    else:
-        df['weighted_early_score'] = df['early_avg_score']
+    df['weighted_early_score'] = features['weighted_early_score'] if early_score_columns else df['early_avg_score']
     
     # Early trend (slope of scores over first 3 months)
     # Use actual month numbers from column names instead of re-numbering sequentially when months missing.
-    df['early_trend'] = 0  # Default value
-    if len(early_score_columns) >= 2:
-        month_numbers = [int(c.split('_')[-1]) for c in early_score_columns]
-        slopes = []
-        for _, row in df.iterrows():
-            y_vals = []
-            x_months = []
-            for col, m in zip(early_score_columns, month_numbers):
-                val = row[col]
-                if not pd.isna(val) and val > 0:
-                    y_vals.append(val)
-                    x_months.append(m)
-            if len(y_vals) >= 2:
-                try:
-                    slope, _, _, _, _ = stats.linregress(x_months, y_vals)
-                    slopes.append(slope)
-                except Exception:
-                    slopes.append(0)
-            else:
-                slopes.append(0)
-        df['early_trend'] = slopes
+    df['early_trend'] = features['early_trend'] if len(early_score_columns) >= 2 else 0
     
     # Fill any remaining NaN values
     early_warning_features = [
@@ -148,15 +247,72 @@ def create_early_warning_features(df):
     
     return df
 
+def file_mtime_ns(path):
+    """Modification time of a file for cache keys, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+@lru_cache(maxsize=4)
+def read_model_components(model_path, scaler_path, features_path, mtimes_ns):
+    """
+    Unpickle the model pipeline, scaler and feature list.
+    mtimes_ns is only part of the cache key, so retraining the model invalidates the entry.
+    """
+    model = joblib.load(model_path)  # This is now a Pipeline
+    # If pipeline, scaler is inside; still load external scaler for backward compatibility
+    if os.path.exists(scaler_path):
+        scaler = joblib.load(scaler_path)
+    else:
+        scaler = getattr(model, 'named_steps', {}).get('scaler', None)
+    model_features = joblib.load(features_path)
+    return model, scaler, model_features
+
+def load_model_components(model_path, scaler_path, features_path):
+    """Load (model, scaler, feature names), cached until any of the files changes"""
+    mtimes_ns = tuple(file_mtime_ns(path) for path in (model_path, scaler_path, features_path))
+    return read_model_components(model_path, scaler_path, features_path, mtimes_ns)
+
+def print_prediction_summary(total_count, at_risk_count, confidence_counts, risk_confidence):
+    """
+    Print the prediction summary block.
+    
+    Args:
+        total_count: Number of students predicted
+        at_risk_count: Number of students predicted at risk
+        confidence_counts: Series of student counts per prediction confidence level
+        risk_confidence: DataFrame of student counts by risk status (rows) and confidence level (columns)
+    """
+    not_at_risk_count = total_count - at_risk_count
+    print(f"\n{'='*50}")
+    print("PREDICTION SUMMARY")
+    print(f"{'='*50}")
+    print(f"Total students: {total_count}")
+    print(f"Predicted at-risk: {at_risk_count} ({at_risk_count/total_count*100:.1f}%)")
+    print(f"Predicted not at-risk: {not_at_risk_count} ({not_at_risk_count/total_count*100:.1f}%)")
+    
+    # Confidence distribution
+    print(f"\nPrediction confidence distribution:")
+    for category, count in confidence_counts.items():
+        if not count:
+            continue  # categoricals also report unused levels
+        print(f"  {category}: {count} ({count/total_count*100:.1f}%)")
+    
+    # Risk level distribution by confidence
+    print(f"\nRisk distribution by confidence level:")
+    print(risk_confidence)
+
 def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None,
-                               model_path=None, scaler_path=None, features_path=None):
+                               model_path=None, scaler_path=None, features_path=None,
+                               fill_values=None, verbose=True):
     """
     Predict at-risk status for students using the trained model.
     
     Parameters:
     -----------
     input_path : str, optional
-        Path to the input CSV file containing student data
+        Path to the input CSV or Parquet file containing student data
     input_df : DataFrame, optional
         DataFrame containing student data (alternative to input_path)
     output_path : str, optional
@@ -167,6 +323,11 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
         Path to the saved scaler (default: models/scaler.pkl)
     features_path : str, optional
         Path to the saved features list (default: models/features.pkl)
+    fill_values : array-like, optional
+        Value per model feature (in model feature order) used for missing values
+        (default: the feature means of this dataset)
+    verbose : bool, optional
+        Print progress and the prediction summary (default: True)
     
     Returns:
     --------
@@ -184,11 +345,16 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
     # Load the data
     if input_df is not None:
         df = input_df.copy()
-        print(f"Using provided DataFrame with {df.shape[0]} rows and {df.shape[1]} columns")
+        if verbose:
+            print(f"Using provided DataFrame with {df.shape[0]} rows and {df.shape[1]} columns")
     elif input_path is not None:
         try:
-            df = pd.read_csv(input_path)
-            print(f"Loaded data from {input_path}: {df.shape[0]} rows and {df.shape[1]} columns")
+            if input_path.endswith('.parquet'):
+                df = pd.read_parquet(input_path)
+            else:
+                df = pd.read_csv(input_path)
+            if verbose:
+                print(f"Loaded data from {input_path}: {df.shape[0]} rows and {df.shape[1]} columns")
         except Exception as e:
             print(f"Error loading data from {input_path}: {str(e)}")
             return None
@@ -198,15 +364,11 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
     
     # Load model components
     try:
-        print("Loading model components...")
-        model = joblib.load(model_path)  # This is now a Pipeline
-        # If pipeline, scaler is inside; still load external scaler for backward compatibility
-        if os.path.exists(scaler_path):
-            scaler = joblib.load(scaler_path)
-        else:
-            scaler = getattr(model, 'named_steps', {}).get('scaler', None)
-        model_features = joblib.load(features_path)
-        print(f"Model (pipeline) loaded successfully. Requires {len(model_features)} features.")
+        if verbose:
+            print("Loading model components...")
+        model, scaler, model_features = load_model_components(model_path, scaler_path, features_path)
+        if verbose:
+            print(f"Model (pipeline) loaded successfully. Requires {len(model_features)} features.")
     except Exception as e:
         print(f"Error loading model components: {str(e)}")
         print(f"Make sure model files exist at:")
@@ -216,7 +378,8 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
         return None
     
     # Create early warning features if they don't exist
-    print("Creating early warning features...")
+    if verbose:
+        print("Creating early warning features...")
     df = create_early_warning_features(df)
     
     # Check for missing required features
@@ -227,32 +390,39 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
         print(df.columns.tolist())
         return None
     
-    # Extract features for prediction
-    X = df[model_features].copy()
+    # Extract features for prediction (the model takes the plain matrix, in model_features order)
+    X = df[model_features].to_numpy(dtype=np.float64)
     
     # Handle missing values
-    missing_values = X.isnull().sum()
-    if missing_values.sum() > 0:
-        print(f"Warning: Found {missing_values.sum()} missing values. Filling with feature means.")
-        X = X.fillna(X.mean())
-    
-    # Decide whether we need external scaling: if pipeline contains scaler we pass raw X; else transform.
+    missing_mask = np.isnan(X)
+    if missing_mask.any():
+        if verbose:
+            print(f"Warning: Found {np.count_nonzero(missing_mask)} missing values. Filling with feature means.")
+        if fill_values is None:
+            fill_values = np.nanmean(X, axis=0)
+        X = np.where(missing_mask, np.asarray(fill_values, dtype=np.float64), X)
+    
+    # Scale in float64 (inside the pipeline, or with the external scaler), then hand the estimator a
+    # C-contiguous float32 matrix: the forest compares features as float32, so this is the conversion
+    # it would otherwise make itself, and the tree traversal reads half the bytes
     try:
-        need_external_scaling = not (hasattr(model, 'named_steps') and 'scaler' in model.named_steps)
-        if need_external_scaling and scaler is not None:
-            X_for_inference = scaler.transform(X)
+        if hasattr(model, 'named_steps') and 'scaler' in model.named_steps:
+            X_for_inference = model[:-1].transform(X)
+            estimator = model[-1]
         else:
-            X_for_inference = X  # Pipeline (with internal scaler) or no scaler required
+            X_for_inference = scaler.transform(X) if scaler is not None else X
+            estimator = model
+        X_for_inference = np.ascontiguousarray(X_for_inference, dtype=np.float32)
     except Exception as e:
         print(f"Error preparing features for prediction: {str(e)}")
         return None
 
     # Make predictions
-    print("Making predictions...")
+    if verbose:
+        print("Making predictions...")
     try:
-        # Predict (pipeline handles internal scaling if present)
-        predictions = model.predict(X_for_inference)
-        proba = model.predict_proba(X_for_inference)
+        # One pass through the trees
+        proba = estimator.predict_proba(X_for_inference)
 
         # Robust class label handling
         if hasattr(model, 'classes_'):
@@ -283,6 +453,11 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
         not_at_risk_index = classes.index(not_at_risk_label)
         at_risk_prob = proba[:, at_risk_index]
         not_at_risk_prob = proba[:, not_at_risk_index]
+        
+        # The predicted class is the most probable one, exactly as model.predict picks it
+        predicted_index = np.argmax(proba, axis=1)
+        predictions = np.asarray(classes)[predicted_index]
+        predicted_class_prob = proba[np.arange(len(proba)), predicted_index]
     except Exception as e:
         print(f"Error making predictions: {str(e)}")
         return None
@@ -292,59 +467,155 @@ def predict_at_risk_for_dataset(input_path=None, input_df=None, output_path=None
     df['not_at_risk_probability'] = not_at_risk_prob
     # risk_score is explicitly the probability of being at risk
     df['risk_score'] = at_risk_prob
-    df['risk_status'] = df['at_risk_prediction'].map({at_risk_label: 'At Risk', not_at_risk_label: 'Not At Risk'})
-
-    # Confidence category based on probability of predicted class (corrected logic)
-    predicted_class_prob = np.where(
-        df['at_risk_prediction'] == at_risk_label,
-        df['at_risk_probability'],
-        df['not_at_risk_probability']
+    # Label columns are categoricals over fixed levels: int8 codes instead of one string object per row
+    df['risk_status'] = pd.Categorical(
+        df['at_risk_prediction'].map({at_risk_label: 'At Risk', not_at_risk_label: 'Not At Risk'}),
+        categories=RISK_STATUS_LABELS
     )
 
-    def map_confidence(p):
-        if p >= 0.90:
-            return 'Very High'
-        if p >= 0.75:
-            return 'High'
-        if p >= 0.60:
-            return 'Medium'
-        return 'Low'
-
-    df['prediction_confidence'] = [map_confidence(p) for p in predicted_class_prob]
+    # Confidence category: bin the predicted class probability against the lower bound of each level
+    # (a missing probability is 'Low')
+    confidence_codes = np.searchsorted(CONFIDENCE_THRESHOLDS, predicted_class_prob, side='right')
+    confidence_codes[np.isnan(predicted_class_prob)] = 0
+    df['prediction_confidence'] = pd.Categorical.from_codes(confidence_codes, categories=CONFIDENCE_LABELS)
     
     # Generate summary statistics
-    at_risk_count = (df['at_risk_prediction'] == at_risk_label).sum()
-    not_at_risk_count = (df['at_risk_prediction'] == not_at_risk_label).sum()
-    total_count = len(df)
-    
-    print(f"\n{'='*50}")
-    print("PREDICTION SUMMARY")
-    print(f"{'='*50}")
-    print(f"Total students: {total_count}")
-    print(f"Predicted at-risk: {at_risk_count} ({at_risk_count/total_count*100:.1f}%)")
-    print(f"Predicted not at-risk: {not_at_risk_count} ({not_at_risk_count/total_count*100:.1f}%)")
-    
-    # Confidence distribution
-    confidence_counts = df['prediction_confidence'].value_counts()
-    print(f"\nPrediction confidence distribution:")
-    for category, count in confidence_counts.items():
-        print(f"  {category}: {count} ({count/total_count*100:.1f}%)")
-    
-    # Risk level distribution by confidence
-    print(f"\nRisk distribution by confidence level:")
-    risk_confidence = df.groupby(['risk_status', 'prediction_confidence']).size().unstack(fill_value=0)
-    print(risk_confidence)
+    if verbose:
+        print_prediction_summary(
+            len(df),
+            int((df['at_risk_prediction'] == at_risk_label).sum()),
+            df['prediction_confidence'].value_counts(),
+            df.groupby(['risk_status', 'prediction_confidence'], observed=True).size().unstack(fill_value=0)
+        )
     
     # Save results if output path is provided
     if output_path is not None:
         try:
             df.to_csv(output_path, index=False)
-            print(f"\nPredictions saved to: {output_path}")
+            if verbose:
+                print(f"\nPredictions saved to: {output_path}")
         except Exception as e:
             print(f"Error saving predictions: {str(e)}")
     
     return df
 
+def predict_at_risk_for_csv_in_chunks(input_path, output_path, chunksize=100_000,
+                                      model_path=None, scaler_path=None, features_path=None):
+    """
+    Predict at-risk status for a large CSV file chunk by chunk, appending each chunk's
+    predictions to the output CSV so neither the input nor the result is held in memory at once.
+    A first pass over the file collects the feature means used to fill missing values, so the
+    predictions match predict_at_risk_for_dataset on the whole file whatever the chunk size.
+    
+    Parameters:
+    -----------
+    input_path : str
+        Path to the input CSV file containing student data
+    output_path : str
+        Path to write the output CSV with predictions (overwritten)
+    chunksize : int, optional
+        Number of rows read and predicted at a time (default: 100,000)
+    model_path, scaler_path, features_path : str, optional
+        Paths to model components
+    
+    Returns:
+    --------
+    dict with the number of predictions and at-risk students, or None on failure
+    """
+    # Set default model paths
+    if model_path is None:
+        model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'student_risk_model.pkl')
+    if scaler_path is None:
+        scaler_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'scaler.pkl')
+    if features_path is None:
+        features_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'features.pkl')
+    
+    try:
+        _, _, model_features = load_model_components(model_path, scaler_path, features_path)
+    except Exception as e:
+        print(f"Error loading model components: {str(e)}")
+        return None
+    
+    # First pass: sum and count of the present values of each model feature over the whole file,
+    # reading only the model features and the monthly columns the early warning features come from
+    def first_pass_column(col):
+        return col in model_features or col.startswith(('Score_Month_', 'TimeSpent_Month_'))
+    
+    feature_sums = np.zeros(len(model_features))
+    feature_counts = np.zeros(len(model_features), dtype=np.int64)
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, usecols=first_pass_column):
+            chunk = create_early_warning_features(chunk)
+            missing_features = [col for col in model_features if col not in chunk.columns]
+            if missing_features:
+                print(f"Error: Missing required features: {missing_features}")
+                return None
+            X = chunk[model_features].to_numpy(dtype=np.float64)
+            feature_sums += np.nansum(X, axis=0)
+            feature_counts += np.count_nonzero(~np.isnan(X), axis=0)
+    except Exception as e:
+        print(f"Error reading {input_path}: {str(e)}")
+        return None
+    
+    # A feature with no values at all stays NaN, as np.nanmean leaves it
+    fill_values = np.full(len(model_features), np.nan)
+    np.divide(feature_sums, feature_counts, out=fill_values, where=feature_counts > 0)
+    
+    predictions_count = 0
+    at_risk_count = 0
+    confidence_counts = None
+    risk_confidence = None
+    try:
+        for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            chunk_predictions = predict_at_risk_for_dataset(
+                input_df=chunk,
+                model_path=model_path,
+                scaler_path=scaler_path,
+                features_path=features_path,
+                fill_values=fill_values,
+                verbose=False
+            )
+            if chunk_predictions is None:
+                return None
+            
+            # The first chunk replaces any previous output and writes the header
+            chunk_predictions.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            predictions_count += len(chunk_predictions)
+            at_risk_count += int((chunk_predictions['risk_status'] == 'At Risk').sum())
+            
+            # Accumulate the summary tables over chunks
+            chunk_confidence = chunk_predictions['prediction_confidence'].value_counts()
+            chunk_risk_confidence = chunk_predictions.groupby(
+                ['risk_status', 'prediction_confidence'], observed=False
+            ).size().unstack(fill_value=0)
+            if confidence_counts is None:
+                confidence_counts, risk_confidence = chunk_confidence, chunk_risk_confidence
+            else:
+                confidence_counts = confidence_counts.add(chunk_confidence, fill_value=0)
+                risk_confidence = risk_confidence.add(chunk_risk_confidence, fill_value=0)
+    except Exception as e:
+        print(f"Error predicting from {input_path}: {str(e)}")
+        return None
+    
+    missing_count = int(predictions_count * len(model_features) - feature_counts.sum())
+    if missing_count:
+        print(f"Warning: Found {missing_count} missing values. Filled with feature means.")
+    if predictions_count:
+        # Drop the levels no student fell into, as the single-dataset summary does
+        risk_confidence = risk_confidence.loc[risk_confidence.sum(axis=1) > 0, risk_confidence.sum(axis=0) > 0]
+        print_prediction_summary(
+            predictions_count,
+            at_risk_count,
+            confidence_counts.astype(int).sort_values(ascending=False),
+            risk_confidence.astype(int)
+        )
+    print(f"\nPredictions for {predictions_count} students saved to: {output_path}")
+    return {
+        'predictions_count': predictions_count,
+        'at_risk_count': at_risk_count,
+        'output_path': output_path
+    }
+
 def predict_risk_from_raw_data(data_dir=None, output_path=None, model_path=None, scaler_path=None, features_path=None):
     """
     Complete prediction pipeline: load raw CSV data, process it, and make predictions.
@@ -486,13 +757,22 @@ if __name__ == "__main__":
             print(high_risk_display.to_string(index=False))
     
     # Option 2: Test with existing processed data
-    processed_data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml_features.csv')
+    processed_data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml_features.parquet')
+    if not os.path.exists(processed_data_path):
+        processed_data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml_features.csv')
     if os.path.exists(processed_data_path):
         print(f"\n\nOption 2: Predicting from existing processed data")
-        processed_predictions = predict_at_risk_for_dataset(
-            input_path=processed_data_path,
-            output_path="processed_data_predictions.csv"
-        )
+        if processed_data_path.endswith('.csv'):
+            # Stream CSVs so large feature files are never loaded whole
+            processed_predictions = predict_at_risk_for_csv_in_chunks(
+                input_path=processed_data_path,
+                output_path="processed_data_predictions.csv"
+            )
+        else:
+            processed_predictions = predict_at_risk_for_dataset(
+                input_path=processed_data_path,
+                output_path="processed_data_predictions.csv"
+            )
         
         if processed_predictions is not None:
             print("Predictions from processed data completed successfully!")
@@ -31,8 +31,10 @@ def train_risk_model():
     print(f"Training with {len(feature_names)} features and {len(features_df)} samples")
     
     # Separate features from ID columns
+    # float32 matches the precision the random forest uses internally and halves the
+    # memory the scaler and cross-validation copies move around
     id_cols = ['studentId', 'courseId']
-    X = features_df.drop(columns=id_cols)
+    X = features_df.drop(columns=id_cols).astype(np.float32)
     y = target_series
 
     # Build pipeline (avoid pre-scaling leakage in CV)
@@ -44,7 +46,8 @@ def train_risk_model():
             min_samples_split=5,
             min_samples_leaf=2,
             random_state=42,
-            class_weight='balanced'
+            class_weight='balanced',
+            n_jobs=-1
         ))
     ])
 
@@ -55,7 +58,7 @@ def train_risk_model():
 
     # Cross-validation BEFORE fitting final model
     print("Running cross-validation (pipeline with internal scaling)...")
-    cv_scores = cross_val_score(pipeline, X_train, y_train, cv=5, scoring='roc_auc')
+    cv_scores = cross_val_score(pipeline, X_train, y_train, cv=5, scoring='roc_auc', n_jobs=-1)
     print(f"Cross-validation AUC: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
 
     # Fit pipeline on full training split
@@ -84,6 +87,9 @@ def train_risk_model():
     print("\nTop 10 Most Important Features:")
     print(feature_importance.head(10))
     
+    # Predictions are made a few rows at a time, where a thread pool per call costs more than it saves
+    model.set_params(n_jobs=None)
+
     # Save model and artifacts
     model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
     os.makedirs(model_dir, exist_ok=True)
@@ -1,10 +1,11 @@
+# import numpy as np
 # import pandas as pd
-# df = pd.read_csv(r"../output/risk_predictions_20250913_185330.csv")
+# df = pd.read_csv(r"../output/risk_predictions_20250913_185330.csv", usecols=["risk_score", "at_risk_prediction"], memory_map=True)
 # print(df["risk_score"].describe())
-# print("Nulls:", df["risk_score"].isna().sum()) 
-# high = (df["risk_score"] >= 0.70).sum()
-# med = ((df["risk_score"] >= 0.40) & (df["risk_score"] < 0.70)).sum() 
-# low = (df["risk_score"] < 0.40).sum()
+# rs = df["risk_score"].to_numpy()
+# nulls = np.isnan(rs)
+# print("Nulls:", nulls.sum())
+# low, med, high = np.bincount(np.digitize(rs[~nulls], [0.40, 0.70]), minlength=3)
 
-# print("Buckets:", {"high": high, "medium": med, "low": low}, "Total:", high+med+low, "Rows:", len(df)) 
-# print("Class dist:\n", df["at_risk_prediction"].value_counts())
\ No newline at end of file
+# print("Buckets:", {"high": high, "medium": med, "low": low}, "Total:", high+med+low, "Rows:", len(df))
+# print("Class dist:\n", df["at_risk_prediction"].value_counts())